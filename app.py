@@ -10,20 +10,23 @@ This dashboard displays:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import sys
 import os
+import time
+from contextlib import contextmanager
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from data_loader import load_electricity_data, load_water_data
-from data_preprocessing import preprocess_data, filter_by_block
-from analysis import (
-    calculate_statistics, detect_anomalies, 
-    get_anomalies_summary, analyze_trends, compare_blocks
-)
-from prediction import get_prediction_summary
+from data_loader import IncrementalCSVReader
+from data_preprocessing import build_block_index, filter_by_block, filter_by_date_windows
+from analysis import AnomalyThresholdIndex, analyze_block_trends, compare_blocks
+from backtest import backtest
+from prediction import fit_batched_models, forecast_intervals, get_batched_prediction_summary
+from online_stats import StatsRegistry
+from rollup import RollupCube
 
 
 # Page configuration
@@ -230,7 +233,210 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Data source for each resource type: (CSV file, consumption column, unit)
+RESOURCES = {
+    "Electricity": ('data/electricity_data.csv', 'units_consumed', 'kWh Units'),
+    "Water": ('data/water_data.csv', 'liters_used', 'Liters'),
+}
+
+
+@st.cache_resource
+def get_data_reader(resource_type):
+    """Shared incremental reader for a resource's meter log"""
+    file_path, consumption_col, _ = RESOURCES[resource_type]
+    return IncrementalCSVReader(file_path, consumption_col)
+
+
+def subscribe_to_readers(update):
+    """
+    Feed every resource's new rows to ``update(resource_type, rows,
+    consumption_col, reset=...)`` on each reader refresh
+    """
+    def feed(resource_type, consumption_col):
+        def on_update(rows, reloaded):
+            update(resource_type, rows, consumption_col, reset=reloaded)
+        return on_update
+    
+    for resource_type, (_, consumption_col, _) in RESOURCES.items():
+        get_data_reader(resource_type).subscribe(feed(resource_type, consumption_col))
+
+
+@st.cache_resource
+def get_stats_registry():
+    """
+    Running per-block statistics of every resource, fed by the readers
+    with each refresh's new rows so the data is never rescanned
+    """
+    registry = StatsRegistry()
+    subscribe_to_readers(registry.update_frame)
+    return registry
+
+
+@st.cache_resource
+def get_rollup_cube():
+    """Day/week/month rollups of every resource, maintained incrementally"""
+    cube = RollupCube()
+    subscribe_to_readers(cube.update)
+    return cube
+
+
+# Memoized pipeline stages, shared by all sessions. Each stage is keyed on
+# the reader's data version plus its own arguments; frames are passed as
+# underscore arguments so Streamlit does not hash them. Frames and fitted
+# models are cached as shared resources (no copy), small results as data.
+CACHE_MAX_ENTRIES = 64
+
+# Default number of standard deviations used to flag anomalies
+ANOMALY_THRESHOLD = 2.0
+
+# Anomaly detection methods offered in the Anomaly Detection tab
+ANOMALY_METHODS = {
+    "Mean / Std Dev": 'std',
+    "Median / MAD (robust to spikes)": 'mad',
+}
+
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_block_index(data_version, resource_type, _df):
+    """Partition index (block -> row range), built once per data version"""
+    return build_block_index(_df)
+
+
+def get_block_frame(data_version, resource_type, block, df):
+    """Rows of one block (or all rows) as a zero-copy slice"""
+    if block == "All":
+        return df
+    block_index = cached_block_index(data_version, resource_type, df)
+    return filter_by_block(df, block, block_index)
+
+
+def get_running_stats(stats_registry, resource_type, block):
+    """Running statistics of one block (or all blocks) of a resource"""
+    return stats_registry.get(resource_type, None if block == "All" else block)
+
+
+def get_statistics(stats_registry, resource_type, block):
+    """Statistics of one block (or all data) read from the accumulators"""
+    return get_running_stats(stats_registry, resource_type, block).to_dict()
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_week_comparison(data_version, resource_type, block, _df):
+    """Total consumption of the latest week and of the week before it"""
+    _, consumption_col, _ = RESOURCES[resource_type]
+    if block == "All":
+        block_index = cached_block_index(data_version, resource_type, _df)
+    else:
+        block_index = build_block_index(_df)
+    
+    last_day = _df['date'].max()
+    windows = [
+        (last_day - pd.Timedelta(days=6), last_day),
+        (last_day - pd.Timedelta(days=13), last_day - pd.Timedelta(days=7))
+    ]
+    this_week, last_week = filter_by_date_windows(_df, windows, block_index)
+    return float(this_week[consumption_col].sum()), float(last_week[consumption_col].sum())
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_block_trends(data_version, resource_type, _df):
+    """Trends of every block, computed together once per data version"""
+    _, consumption_col, _ = RESOURCES[resource_type]
+    block_index = cached_block_index(data_version, resource_type, _df)
+    return analyze_block_trends(_df, consumption_col, block_index)
+
+
+def get_block_comparison(stats_registry, resource_type, df):
+    """Block comparison table built from the running block statistics"""
+    _, consumption_col, _ = RESOURCES[resource_type]
+    block_stats = stats_registry.block_table(resource_type)
+    return compare_blocks(df, consumption_col, block_stats)
+
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_threshold_index(data_version, resource_type, block, method, _df, _stats_registry):
+    """
+    Sorted anomaly z-scores, answering any threshold without a rescan;
+    across all blocks each block keeps its own baseline. The statistics
+    snapshot belongs to data_version, so it is not part of the key.
+    """
+    _, consumption_col, _ = RESOURCES[resource_type]
+    by_block = block == "All"
+    stats = None
+    if method == 'std':
+        if by_block:
+            stats = _stats_registry.block_table(resource_type)
+        else:
+            stats = get_running_stats(_stats_registry, resource_type, block)
+    return AnomalyThresholdIndex(
+        _df, consumption_col, stats=stats, by_block=by_block, method=method
+    )
+
+
+# Forecast horizons (days) offered in the ML Predictions tab
+FORECAST_HORIZONS = [7, 30, 90, 365]
+
+# Days ahead scored by the rolling-origin backtest
+BACKTEST_HORIZONS = (1, 7, 30)
+
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_prediction_models(data_version, resource_type, _df):
+    """Prediction models of every block, fitted together once per data version"""
+    _, consumption_col, _ = RESOURCES[resource_type]
+    block_index = cached_block_index(data_version, resource_type, _df)
+    return fit_batched_models(_df, consumption_col, block_index)
+
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_predictions(data_version, resource_type, _df):
+    """Prediction summaries of every block from the batched fit"""
+    _, consumption_col, _ = RESOURCES[resource_type]
+    models = cached_prediction_models(data_version, resource_type, _df)
+    return get_batched_prediction_summary(_df, consumption_col, models=models)
+
+
+@st.cache_resource(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_forecasts(data_version, resource_type, horizon, _df):
+    """Forecasts and prediction intervals of every block for one horizon"""
+    models = cached_prediction_models(data_version, resource_type, _df)
+    if models is None:
+        return None
+    forecasts = forecast_intervals(models, horizon)
+    rows = {block: position for position, block in enumerate(models.index)}
+    return rows, forecasts
+
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_backtest(data_version, resource_type, _df):
+    """Rolling-origin backtest of every block, run once per data version"""
+    _, consumption_col, _ = RESOURCES[resource_type]
+    block_index = cached_block_index(data_version, resource_type, _df)
+    return backtest(_df, consumption_col, horizons=BACKTEST_HORIZONS, by_block=True,
+                    block_index=block_index)
+
+
+def get_forecast(data_version, resource_type, horizon, block, df):
+    """Forecast, lower and upper bound arrays of one block (None if unknown)"""
+    cached = cached_forecasts(data_version, resource_type, horizon, df)
+    if cached is None or block not in cached[0]:
+        return None
+    position = cached[0][block]
+    return {name: values[position] for name, values in cached[1].items()}
+
+
+def get_prediction(data_version, resource_type, block, df):
+    """Prediction of one block, looked up in the batched fit"""
+    return cached_predictions(data_version, resource_type, df).get(block)
+
+
 def main():
+    with dashboard_run() as run:
+        render_dashboard(run)
+
+
+def render_dashboard(run):
+    """Full script run: sidebar controls and the open tab"""
     # Header with custom styling
     st.markdown("""
         <div style='text-align: center; padding: 1rem 0 2rem 0;'>
@@ -258,33 +464,32 @@ def main():
         ["Electricity", "Water"]
     )
     
-    # Load data
-    if resource_type == "Electricity":
-        df = load_electricity_data()
-        consumption_col = 'units_consumed'
-        unit = 'kWh Units'
-    else:
-        df = load_water_data()
-        consumption_col = 'liters_used'
-        unit = 'Liters'
+    # Load data - only rows appended since the last run are parsed
+    _, consumption_col, unit = RESOURCES[resource_type]
+    reader = get_data_reader(resource_type)
+    registry = get_stats_registry()
+    
+    try:
+        # Running statistics are copied under the reader's lock, so they
+        # describe exactly the frame and version this run works with
+        df, data_version, stats_registry = reader.refresh(
+            snapshot=lambda: registry.snapshot(resource_type)
+        )
+    except Exception as e:
+        print(f"❌ Error loading {resource_type.lower()} data: {e}")
+        df, data_version, stats_registry = None, None, None
     
     if df is None:
         st.error("❌ Failed to load data. Please check if data files exist.")
         return
     
-    # Preprocess data
-    df = preprocess_data(df)
-    
     # Hostel block selection
     st.sidebar.markdown("### 🏢 Hostel Block")
-    blocks = df['hostel_block'].unique()
+    blocks = list(cached_block_index(data_version, resource_type, df))
     selected_block = st.sidebar.selectbox("Select Block", ["All"] + list(blocks), label_visibility="collapsed")
     
     # Filter data by block if selected
-    if selected_block != "All":
-        df_filtered = filter_by_block(df, selected_block)
-    else:
-        df_filtered = df
+    df_filtered = get_block_frame(data_version, resource_type, selected_block, df)
     
     # Refresh button
     if st.sidebar.button("🔄 Refresh Data"):
@@ -301,20 +506,48 @@ def main():
         </div>
     """, unsafe_allow_html=True)
     
-    # Main content area
+    # Main content area - tabs track which one is open so only the
+    # visible tab runs; each tab is a fragment, so controls inside it
+    # rerun that tab alone
     tab1, tab2, tab3, tab4 = st.tabs([
         "📈 Analytics Dashboard", 
         "🔍 Anomaly Detection", 
         "🤖 ML Predictions",
         "📊 Raw Data"
-    ])
+    ], key="active_tab", on_change="rerun")
+    
+    if tab1.open:
+        with tab1:
+            render_analytics_tab(df, df_filtered, blocks, selected_block,
+                                 resource_type, data_version, stats_registry)
+    
+    if tab2.open:
+        with tab2:
+            render_anomaly_tab(df_filtered, selected_block, resource_type, data_version,
+                               stats_registry)
+    
+    if tab3.open:
+        with tab3:
+            render_predictions_tab(df, blocks, selected_block, resource_type, data_version)
+    
+    if tab4.open:
+        with tab4:
+            render_raw_data_tab(df_filtered, resource_type)
+    
+    show_panel_timings(run)
+
+
+@st.fragment
+def render_analytics_tab(df, df_filtered, blocks, selected_block, resource_type, data_version,
+                         stats_registry):
+    """Tab 1: Analytics Dashboard"""
+    _, consumption_col, unit = RESOURCES[resource_type]
     
-    # Tab 1: Analytics Dashboard
-    with tab1:
+    with panel_timer("Analytics Dashboard"):
         st.header(f"📈 {resource_type} Consumption Analytics")
         
         # Statistics
-        stats = calculate_statistics(df_filtered, consumption_col)
+        stats = get_statistics(stats_registry, resource_type, selected_block)
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -327,20 +560,39 @@ def main():
         with col4:
             st.metric("Total Consumption", f"{stats['total']:.2f} {unit}")
         
+        # Week-over-week comparison (latest 7 days vs. the 7 days before)
+        this_week, last_week = cached_week_comparison(
+            data_version, resource_type, selected_block, df_filtered
+        )
+        st.metric(
+            "This Week vs Last Week",
+            f"{this_week:.2f} {unit}",
+            delta=f"{this_week - last_week:.2f} {unit}"
+        )
+        
         st.markdown("---")
         
-        # Trends
-        trends = analyze_trends(df_filtered, consumption_col)
+        # Trends - every block's trend comes from one grouped pass, so
+        # day-to-day changes never mix readings of different blocks
+        block_trends = cached_block_trends(data_version, resource_type, df)
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📊 Consumption Trends")
-            trend_direction = "📈 Increasing" if trends['is_increasing'] else "📉 Decreasing"
-            st.write(f"**Overall Trend:** {trend_direction}")
-            st.write(f"**Avg Daily Change:** {trends['average_daily_change']:.2f} {unit}")
-            st.write(f"**Max Increase:** {trends['max_increase']:.2f} {unit}")
-            st.write(f"**Max Decrease:** {trends['max_decrease']:.2f} {unit}")
+            if selected_block == "All":
+                increasing = int(block_trends['is_increasing'].sum())
+                st.write(f"**Blocks Increasing:** {increasing} of {len(block_trends)}")
+                st.dataframe(
+                    block_trends.drop(columns='average_pct_change').round(2), width="stretch"
+                )
+            else:
+                trends = block_trends.loc[selected_block]
+                trend_direction = "📈 Increasing" if trends['is_increasing'] else "📉 Decreasing"
+                st.write(f"**Overall Trend:** {trend_direction}")
+                st.write(f"**Avg Daily Change:** {trends['average_daily_change']:.2f} {unit}")
+                st.write(f"**Max Increase:** {trends['max_increase']:.2f} {unit}")
+                st.write(f"**Max Decrease:** {trends['max_decrease']:.2f} {unit}")
         
         with col2:
             st.subheader("📉 Consumption Chart")
@@ -348,7 +600,7 @@ def main():
             
             if selected_block == "All":
                 for block in blocks:
-                    block_data = filter_by_block(df, block)
+                    block_data = get_block_frame(data_version, resource_type, block, df)
                     ax.plot(block_data['date'], block_data[consumption_col], 
                            marker='o', label=f'Block {block}')
             else:
@@ -363,25 +615,64 @@ def main():
             plt.xticks(rotation=45)
             st.pyplot(fig)
         
+        # Monthly totals, read from the rollup cube instead of raw rows
+        st.markdown("---")
+        st.subheader("📅 Monthly Consumption")
+        monthly = get_rollup_cube().frame(
+            resource_type, 'month', None if selected_block == "All" else selected_block
+        )
+        st.bar_chart(
+            monthly.pivot(index='date', columns='hostel_block', values='total'),
+            y_label=f'Consumption ({unit})'
+        )
+        
         # Block comparison
         if selected_block == "All":
             st.markdown("---")
             st.subheader("🏢 Hostel Block Comparison")
-            comparison = compare_blocks(df, consumption_col)
+            comparison = get_block_comparison(stats_registry, resource_type, df)
             st.dataframe(comparison, width="stretch")
+
+
+@st.fragment
+def render_anomaly_tab(df_filtered, selected_block, resource_type, data_version, stats_registry):
+    """Tab 2: Anomaly Detection"""
+    _, consumption_col, unit = RESOURCES[resource_type]
     
-    # Tab 2: Anomaly Detection
-    with tab2:
+    with panel_timer("Anomaly Detection"):
         st.header("🔍 Anomaly Detection Results")
         
-        st.info(
-            "🔎 Anomalies are detected using statistical analysis. "
-            "Values beyond 2 standard deviations from the mean are flagged."
+        method_label = st.radio(
+            "Detection method", list(ANOMALY_METHODS), horizontal=True, key="anomaly_method"
+        )
+        method = ANOMALY_METHODS[method_label]
+        
+        threshold = st.slider(
+            "Anomaly threshold", min_value=1.0, max_value=4.0, value=ANOMALY_THRESHOLD,
+            step=0.1, key="anomaly_threshold"
         )
         
-        # Detect anomalies
-        df_anomaly = detect_anomalies(df_filtered, consumption_col, threshold=2.0)
-        anomaly_summary = get_anomalies_summary(df_anomaly, consumption_col)
+        if method == 'mad':
+            st.info(
+                "🔎 Anomalies are detected using robust statistics. "
+                f"Values beyond {threshold:g} scaled median absolute deviations from their "
+                "block's median are flagged, so single huge spikes cannot hide others."
+            )
+        else:
+            st.info(
+                "🔎 Anomalies are detected using statistical analysis. "
+                f"Values beyond {threshold:g} standard deviations from their block's mean are flagged."
+            )
+        
+        # Detect anomalies - z-scores are sorted once, every threshold is
+        # then answered by binary search
+        threshold_index = cached_threshold_index(
+            data_version, resource_type, selected_block, method, df_filtered, stats_registry
+        )
+        anomaly_summary = threshold_index.summary(threshold)
+        is_anomaly, _ = threshold_index.flags(threshold)
+        # Anomalous rows are selected once, for the chart and the table
+        anomalies = threshold_index.flagged_rows(threshold)
         
         col1, col2, col3 = st.columns(3)
         
@@ -414,18 +705,17 @@ def main():
             fig, ax = plt.subplots(figsize=(10, 5))
             
             # Plot normal data
-            normal_data = df_anomaly[df_anomaly['is_anomaly'] == False]
+            normal_data = df_filtered[~is_anomaly]
             ax.plot(normal_data['date'], normal_data[consumption_col], 
                    marker='o', color='green', label='Normal', linewidth=2)
             
             # Plot anomalies
-            anomalies = df_anomaly[df_anomaly['is_anomaly'] == True]
             if len(anomalies) > 0:
                 ax.scatter(anomalies['date'], anomalies[consumption_col], 
                           color='red', s=100, label='Anomaly', zorder=5)
             
             # Add mean line
-            mean_val = df_anomaly[consumption_col].mean()
+            mean_val = df_filtered[consumption_col].mean()
             ax.axhline(y=mean_val, color='blue', linestyle='--', 
                       label=f'Mean ({mean_val:.2f})')
             
@@ -437,17 +727,36 @@ def main():
             plt.xticks(rotation=45)
             st.pyplot(fig)
         
+        # Per-block breakdown when all blocks are shown
+        if selected_block == "All":
+            st.markdown("---")
+            st.subheader("🏢 Anomalies by Block")
+            st.dataframe(threshold_index.block_summary(threshold), width="stretch")
+        
         # Show anomaly records
         if anomaly_summary['anomaly_count'] > 0:
             st.markdown("---")
             st.subheader("🔴 Detected Anomaly Records")
-            anomaly_records = df_anomaly[df_anomaly['is_anomaly'] == True][
+            anomaly_records = anomalies[
                 ['date', 'hostel_block', consumption_col, 'anomaly_type']
             ]
             st.dataframe(anomaly_records, width="stretch")
+        
+        # Sensitivity of the anomaly count to the threshold
+        st.markdown("---")
+        st.subheader("🎚️ Anomalies by Threshold")
+        curve = threshold_index.curve(np.round(np.arange(1.0, 4.01, 0.1), 1))
+        st.line_chart(
+            curve.set_index('threshold')[['high_usage_count', 'low_usage_count', 'anomaly_count']]
+        )
+
+
+@st.fragment
+def render_predictions_tab(df, blocks, selected_block, resource_type, data_version):
+    """Tab 3: ML Predictions"""
+    _, consumption_col, unit = RESOURCES[resource_type]
     
-    # Tab 3: ML Predictions
-    with tab3:
+    with panel_timer("ML Predictions"):
         st.header("🤖 Machine Learning Predictions")
         
         st.info(
@@ -455,17 +764,38 @@ def main():
             "The model learns from historical patterns and forecasts next-day usage."
         )
         
-        # Generate predictions for each block
+        horizon = st.radio(
+            "Forecast horizon", FORECAST_HORIZONS, format_func=lambda days: f"{days} days",
+            horizontal=True, key="forecast_horizon"
+        )
+        
+        # Generate predictions for each block - one collapsible panel per
+        # block, rendered only while it is expanded
         if selected_block == "All":
             for block in blocks:
-                st.subheader(f"🏢 Block {block} Predictions")
-                show_predictions(df, block, consumption_col, unit)
-                st.markdown("---")
+                render_block_prediction_panel(df, block, resource_type, data_version, horizon)
         else:
-            show_predictions(df, selected_block, consumption_col, unit)
-    
-    # Tab 4: Raw Data
-    with tab4:
+            show_predictions(df, selected_block, consumption_col, unit, resource_type,
+                             data_version, horizon)
+
+
+@st.fragment
+def render_block_prediction_panel(df, block, resource_type, data_version, horizon):
+    """Collapsible per-block prediction panel that runs only when expanded"""
+    _, consumption_col, unit = RESOURCES[resource_type]
+    
+    panel = st.expander(f"🏢 Block {block} Predictions",
+                        key=f"prediction_panel_{block}", on_change="rerun")
+    if panel.open:
+        with panel, panel_timer(f"Predictions: Block {block}"):
+            show_predictions(df, block, consumption_col, unit, resource_type, data_version,
+                             horizon)
+
+
+@st.fragment
+def render_raw_data_tab(df_filtered, resource_type):
+    """Tab 4: Raw Data"""
+    with panel_timer("Raw Data"):
         st.header("📊 Raw Data View")
         
         st.info(f"Showing {len(df_filtered)} records")
@@ -483,10 +813,65 @@ def main():
         )
 
 
-def show_predictions(df, block, consumption_col, unit):
+@contextmanager
+def dashboard_run():
+    """
+    Give every script run its own id: a full run of the page, or a
+    fragment run of one panel on its own. Fragments drawn within a run
+    (by main or by an enclosing fragment) are part of it and share its id.
+    """
+    active = st.session_state.get('active_run')
+    if active is not None:
+        yield active
+        return
+    
+    run = st.session_state['run_count'] = st.session_state.get('run_count', 0) + 1
+    st.session_state['active_run'] = run
+    try:
+        yield run
+    finally:
+        st.session_state['active_run'] = None
+
+
+@contextmanager
+def panel_timer(name):
+    """Record how long a dashboard panel took to render and show it in the panel"""
+    with dashboard_run() as run:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            timings = st.session_state.setdefault('panel_timings', {})
+            timings[name] = {'ms': ms, 'run': run}
+        # Drawn inside the panel's fragment, so a fragment run updates it
+        st.caption(f"⏱️ Rendered in {ms:.1f} ms (run {run})")
+
+
+def show_panel_timings(run):
+    """Sidebar table of the last render time of every panel, as of a full run"""
+    timings = st.session_state.get('panel_timings', {})
+    
+    with st.sidebar.expander("⏱️ Panel Timings"):
+        if not timings:
+            st.write("No panels rendered yet.")
+            return
+        st.dataframe(pd.DataFrame([
+            {
+                'Panel': name,
+                'Time (ms)': round(t['ms'], 1),
+                'Run': t['run'],
+                'Ran This Run': t['run'] == run
+            }
+            for name, t in timings.items()
+        ]), hide_index=True, width="stretch")
+        st.caption(f"Run {run}. Panels rerun on their own show their latest time inside the panel.")
+
+
+def show_predictions(df, block, consumption_col, unit, resource_type, data_version, horizon=7):
     """Helper function to display predictions for a specific block"""
     
-    prediction = get_prediction_summary(df, consumption_col, block)
+    prediction = get_prediction(data_version, resource_type, block, df)
     
     if prediction is None:
         st.error("❌ Unable to generate predictions")
@@ -521,12 +906,35 @@ def show_predictions(df, block, consumption_col, unit):
         )
         st.write(f"**Trend:** {prediction['trend_direction']}")
     
-    # 7-day forecast
-    st.subheader("📅 7-Day Forecast")
-    
+    # Out-of-sample errors: every fold trains only on days before its origin
+    st.subheader("🧪 Rolling-Origin Backtest")
+    backtest_table = cached_backtest(data_version, resource_type, df)
+    if backtest_table is not None and block in backtest_table.index.get_level_values('hostel_block'):
+        block_backtest = backtest_table.xs(block, level='hostel_block')
+        block_backtest = block_backtest[block_backtest['folds'] > 0]
+    else:
+        block_backtest = None
+    if block_backtest is None or len(block_backtest) == 0:
+        st.write("Not enough history to backtest this block yet.")
+    else:
+        st.dataframe(pd.DataFrame({
+            'Days Ahead': block_backtest.index,
+            'Folds': block_backtest['folds'].to_numpy(),
+            'MAE': block_backtest['mae'].round(2).to_numpy(),
+            'RMSE': block_backtest['rmse'].round(2).to_numpy(),
+            'MAPE (%)': block_backtest['mape'].round(1).to_numpy()
+        }), hide_index=True, width="stretch")
+    
+    # Forecast over the selected horizon with 95% prediction intervals
+    st.subheader(f"📅 {horizon}-Day Forecast")
+    
+    forecast = get_forecast(data_version, resource_type, horizon, block, df)
+    days = range(1, horizon + 1)
     forecast_df = pd.DataFrame({
-        'Day': [f'Day +{i+1}' for i in range(7)],
-        'Predicted Consumption': [f"{val:.2f}" for val in prediction['next_week_predictions']]
+        'Day': [f'Day +{i}' for i in days],
+        'Predicted Consumption': [f"{val:.2f}" for val in forecast['forecast']],
+        'Lower (95%)': [f"{val:.2f}" for val in forecast['lower']],
+        'Upper (95%)': [f"{val:.2f}" for val in forecast['upper']]
     })
     
     col1, col2 = st.columns([1, 2])
@@ -536,11 +944,14 @@ def show_predictions(df, block, consumption_col, unit):
     
     with col2:
         fig, ax = plt.subplots(figsize=(8, 4))
-        ax.plot(range(1, 8), prediction['next_week_predictions'], 
-               marker='o', color='purple', linewidth=2)
+        ax.plot(days, forecast['forecast'], 
+               marker='o' if horizon <= 30 else None, color='purple', linewidth=2)
+        ax.fill_between(days, forecast['lower'], forecast['upper'],
+                        color='purple', alpha=0.15, label='95% prediction interval')
         ax.set_xlabel('Days Ahead')
         ax.set_ylabel(f'Predicted Consumption ({unit})')
-        ax.set_title('7-Day Consumption Forecast')
+        ax.set_title(f'{horizon}-Day Consumption Forecast')
+        ax.legend()
         ax.grid(True, alpha=0.3)
         st.pyplot(fig)
 
@@ -0,0 +1,52 @@
+"""
+Synthetic Data Helpers
+Generates large smart meter datasets for the benchmark scripts.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Make the src modules importable the same way app.py does
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def make_meter_frame(n_rows, n_blocks=20, consumption_col='units_consumed', seed=0):
+    """
+    Build a synthetic meter log with daily readings per hostel block.
+    
+    Args:
+        n_rows (int): Approximate number of rows to generate
+        n_blocks (int): Number of hostel blocks
+        consumption_col (str): Name of consumption column
+        seed (int): Random seed
+        
+    Returns:
+        pandas.DataFrame: Frame with date, hostel_block and consumption columns
+    """
+    rng = np.random.default_rng(seed)
+    days = max(1, n_rows // n_blocks)
+    dates = pd.date_range('2000-01-01', periods=days, freq='D')
+    blocks = [f'B{i:04d}' for i in range(n_blocks)]
+    
+    baseline = rng.uniform(200, 600, size=n_blocks)
+    values = (
+        np.repeat(baseline, days)
+        + np.tile(np.arange(days) * 0.05, n_blocks)
+        + rng.normal(0, 25, size=n_blocks * days)
+    )
+    
+    return pd.DataFrame({
+        'date': np.tile(dates.values, n_blocks),
+        'hostel_block': np.repeat(blocks, days),
+        consumption_col: np.round(values, 2),
+    })
+
+
+def write_meter_csv(path, n_rows, n_blocks=20, consumption_col='units_consumed'):
+    """Write a synthetic meter log to CSV in the same layout as data/*.csv."""
+    df = make_meter_frame(n_rows, n_blocks, consumption_col)
+    df.to_csv(path, index=False, date_format='%Y-%m-%d')
+    return df
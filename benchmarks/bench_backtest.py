@@ -0,0 +1,63 @@
+"""
+Benchmark: rolling-origin backtest with a LinearRegression refit per fold
+vs. prefix-sum folds solved all at once, then the prefix-sum backtest of
+years of daily data for every block, expanding and sliding.
+
+Usage:
+    python benchmarks/bench_backtest.py [n_days] [n_blocks]
+"""
+
+import sys
+import time
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from _synthetic import make_meter_frame
+
+from data_preprocessing import preprocess_data
+from backtest import backtest, DEFAULT_HORIZONS
+
+MIN_TRAIN = 14
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def refit_mae(df, col):
+    """Mean absolute error per horizon, refitting every fold from scratch."""
+    errors = {h: [] for h in DEFAULT_HORIZONS}
+    for _, group in df.groupby('hostel_block', observed=True):
+        y = group[col].to_numpy(dtype=float)
+        for t in range(MIN_TRAIN, len(y)):
+            model = LinearRegression().fit(np.arange(1, t + 1).reshape(-1, 1), y[:t])
+            for h in DEFAULT_HORIZONS:
+                if t + h <= len(y):
+                    errors[h].append(abs(model.predict([[t + h]])[0] - y[t + h - 1]))
+    return np.array([np.mean(errors[h]) for h in DEFAULT_HORIZONS])
+
+
+def main():
+    n_days = int(sys.argv[1]) if len(sys.argv) > 1 else 5 * 365
+    n_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    col = 'units_consumed'
+    
+    small = preprocess_data(make_meter_frame(n_days * 2, 2, col))
+    expected, elapsed = timed(lambda: refit_mae(small, col))
+    print(f"2 blocks x {n_days} days\n{'refit per fold':<24}{elapsed * 1000:10.1f} ms")
+    result, elapsed = timed(lambda: backtest(small, col, min_train=MIN_TRAIN))
+    print(f"{'prefix sums':<24}{elapsed * 1000:10.1f} ms  "
+          f"equal={np.allclose(result['mae'].to_numpy(), expected)}")
+    
+    df = preprocess_data(make_meter_frame(n_days * n_blocks, n_blocks, col))
+    print(f"\n{n_blocks} blocks x {n_days} days")
+    for label, window in [('expanding window', None), ('sliding 90 days', 90)]:
+        result, elapsed = timed(lambda: backtest(df, col, min_train=MIN_TRAIN, window=window))
+        print(f"{label:<24}{elapsed * 1000:10.1f} ms  folds={result['folds'].sum():,}")
+
+
+if __name__ == '__main__':
+    main()
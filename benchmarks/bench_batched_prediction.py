@@ -0,0 +1,59 @@
+"""
+Benchmark: per-block sklearn prediction summaries vs. one batched
+closed-form fit of every block, at 1,000+ blocks.
+
+Usage:
+    python benchmarks/bench_batched_prediction.py [n_rows] [n_blocks]
+"""
+
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from _synthetic import make_meter_frame
+
+from data_preprocessing import preprocess_data, build_block_index
+from prediction import get_prediction_summary, get_batched_prediction_summary
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def same_summary(expected, actual):
+    metrics = list(expected['model_metrics'])
+    return (
+        np.allclose([expected['model_metrics'][m] for m in metrics],
+                    [actual['model_metrics'][m] for m in metrics], equal_nan=True)
+        and np.allclose(expected['next_week_predictions'], actual['next_week_predictions'])
+        and expected['trend_direction'] == actual['trend_direction']
+    )
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 365_000
+    n_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    col = 'units_consumed'
+    
+    df = preprocess_data(make_meter_frame(n_rows, n_blocks, col))
+    block_index = build_block_index(df)
+    print(f"Rows: {len(df):,}  blocks: {len(block_index)}")
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected, elapsed = timed(lambda: {
+            block: get_prediction_summary(df, col, block, block_index) for block in block_index
+        })
+    print(f"{'per-block sklearn':<24}{elapsed * 1000:10.1f} ms")
+    
+    result, elapsed = timed(lambda: get_batched_prediction_summary(df, col, block_index))
+    equal = all(same_summary(expected[block], result[block]) for block in expected)
+    print(f"{'batched closed form':<24}{elapsed * 1000:10.1f} ms  equal={equal}")
+
+
+if __name__ == '__main__':
+    main()
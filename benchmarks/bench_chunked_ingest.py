@@ -0,0 +1,54 @@
+"""
+Benchmark: whole-file CSV parsing vs. chunked, dtype-pinned streaming.
+Reports wall time and peak traced memory for each mode.
+
+Usage:
+    python benchmarks/bench_chunked_ingest.py [n_rows] [chunksize]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from _synthetic import write_meter_csv
+
+from data_loader import load_electricity_data
+
+
+def measure(**kwargs):
+    # Time and memory are taken in separate runs: tracing slows parsing
+    start = time.perf_counter()
+    df = load_electricity_data(use_cache=False, **kwargs)
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    load_electricity_data(use_cache=False, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak / 1e6
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 250_000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'electricity_data.csv')
+        write_meter_csv(csv_path, n_rows)
+        
+        full, full_time, full_peak = measure(file_path=csv_path)
+        chunked, chunk_time, chunk_peak = measure(file_path=csv_path, chunksize=chunksize)
+        
+        full_mb = full.memory_usage(deep=True).sum() / 1e6
+        chunk_mb = chunked.memory_usage(deep=True).sum() / 1e6
+        
+        print(f"Rows: {n_rows:,}  chunksize: {chunksize:,}")
+        print(f"{'Mode':<12}{'time (s)':>10}{'peak (MB)':>12}{'frame (MB)':>12}")
+        print(f"{'full':<12}{full_time:10.3f}{full_peak:12.1f}{full_mb:12.1f}")
+        print(f"{'chunked':<12}{chunk_time:10.3f}{chunk_peak:12.1f}{chunk_mb:12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Microbenchmark: filter_by_date_range full-copy path vs. binary-search path.
+
+Usage:
+    python benchmarks/bench_date_range.py [n_rows] [n_blocks]
+"""
+
+import sys
+import time
+
+from _synthetic import make_meter_frame
+
+from data_preprocessing import (
+    build_block_index, filter_by_block, filter_by_date_range, filter_by_date_windows
+)
+
+
+def best_of(func, *args, repeat=5, **kwargs):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    n_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    
+    # Synthetic frames are already sorted by hostel_block, date
+    df = make_meter_frame(n_rows, n_blocks)
+    block_index, index_time = best_of(build_block_index, df, repeat=1)
+    block = next(iter(block_index))
+    block_df = filter_by_block(df, block, block_index)
+    single_index = build_block_index(block_df)
+    
+    month = ('2010-03-01', '2010-03-31')
+    this_week = ('2010-03-08', '2010-03-14')
+    last_week = ('2010-03-01', '2010-03-07')
+    
+    cases = [
+        ("All blocks, one month",
+         lambda: filter_by_date_range(df, *month),
+         lambda: filter_by_date_range(df, *month, block_index=block_index)),
+        ("One block, one month",
+         lambda: filter_by_date_range(block_df, *month),
+         lambda: filter_by_date_range(block_df, *month, block_index=single_index)),
+        ("All blocks, two weeks",
+         lambda: [filter_by_date_range(df, *this_week), filter_by_date_range(df, *last_week)],
+         lambda: filter_by_date_windows(df, [this_week, last_week], block_index)),
+    ]
+    
+    print(f"Rows: {len(df):,}  blocks: {n_blocks}  index build: {index_time * 1000:.1f} ms")
+    print(f"{'Case':<26}{'mask+copy (ms)':>16}{'searchsorted (ms)':>20}{'speed-up':>10}")
+    for name, baseline, fast in cases:
+        _, base_time = best_of(baseline)
+        _, fast_time = best_of(fast)
+        print(f"{name:<26}{base_time * 1000:16.2f}{fast_time * 1000:20.3f}"
+              f"{base_time / fast_time:9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark: cold CSV load vs. warm Parquet cache load.
+
+Usage:
+    python benchmarks/bench_loader_cache.py [n_rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from _synthetic import write_meter_csv
+
+from data_loader import load_electricity_data, _cache_path
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'electricity_data.csv')
+        write_meter_csv(csv_path, n_rows)
+        size_mb = os.path.getsize(csv_path) / 1e6
+        print(f"Rows: {n_rows:,}  CSV size: {size_mb:.1f} MB")
+        
+        _, no_cache = timed(load_electricity_data, csv_path, use_cache=False)
+        _, cold = timed(load_electricity_data, csv_path)
+        _, warm = timed(load_electricity_data, csv_path)
+        cache_mb = os.path.getsize(_cache_path(csv_path)) / 1e6
+        
+        print(f"{'CSV only (no cache)':<28}{no_cache:8.3f} s")
+        print(f"{'Cold load (parse + write)':<28}{cold:8.3f} s")
+        print(f"{'Warm load (Parquet cache)':<28}{warm:8.3f} s")
+        print(f"Speed-up warm vs CSV: {no_cache / warm:.1f}x  (cache size {cache_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
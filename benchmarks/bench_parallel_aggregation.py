@@ -0,0 +1,59 @@
+"""
+Benchmark: compare_blocks over one in-memory frame vs. partial aggregates
+merged from a process pool, at 1, 2, 4 and 8 workers, for an in-memory
+frame and for workers parsing byte ranges of a CSV file themselves.
+
+Usage:
+    python benchmarks/bench_parallel_aggregation.py [n_rows] [n_blocks]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from _synthetic import make_meter_frame, write_meter_csv
+
+from analysis import compare_blocks
+from parallel_aggregation import compare_blocks_parallel
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    n_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    col = 'units_consumed'
+    
+    print(f"Rows: {n_rows:,}  blocks: {n_blocks}  CPUs: {os.cpu_count()}")
+    
+    df = make_meter_frame(n_rows, n_blocks, col)
+    expected, elapsed = timed(lambda: compare_blocks(df, col))
+    print(f"\nIn-memory frame\n{'groupby compare_blocks':<28}{elapsed * 1000:10.1f} ms")
+    for workers in WORKER_COUNTS:
+        result, elapsed = timed(lambda: compare_blocks_parallel(df, col, workers=workers))
+        print(f"{f'{workers} worker(s)':<28}{elapsed * 1000:10.1f} ms  "
+              f"equal={result.equals(expected)}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'meter.csv')
+        write_meter_csv(path, n_rows, n_blocks, col)
+        
+        expected, elapsed = timed(lambda: compare_blocks(pd.read_csv(path), col))
+        print(f"\nCSV file\n{'read_csv + compare_blocks':<28}{elapsed * 1000:10.1f} ms")
+        for workers in WORKER_COUNTS:
+            result, elapsed = timed(lambda: compare_blocks_parallel(path, col, workers=workers))
+            print(f"{f'{workers} worker(s)':<28}{elapsed * 1000:10.1f} ms  "
+                  f"equal={result.equals(expected)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: serial get_prediction_summary over every (resource, block)
+pair vs. forecast_blocks at 1, 2, 4 and 8 workers.
+
+Usage:
+    python benchmarks/bench_parallel_forecasting.py [n_rows] [n_blocks]
+"""
+
+import os
+import sys
+import time
+import warnings
+
+from _synthetic import make_meter_frame
+
+from data_preprocessing import preprocess_data, build_block_index
+from prediction import get_prediction_summary
+from parallel_forecasting import forecast_blocks
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def serial_forecasts(sources):
+    results = {}
+    for resource, (df, col) in sources.items():
+        block_index = build_block_index(df)
+        for block in block_index:
+            results[(resource, block)] = get_prediction_summary(df, col, block, block_index)
+    return results
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 730_000
+    n_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    warnings.simplefilter('ignore')
+    
+    sources = {
+        'Electricity': (preprocess_data(make_meter_frame(n_rows, n_blocks, 'units_consumed')),
+                        'units_consumed'),
+        'Water': (preprocess_data(make_meter_frame(n_rows, n_blocks, 'liters_used')),
+                  'liters_used')
+    }
+    print(f"Rows per resource: {n_rows:,}  blocks per resource: {n_blocks}  CPUs: {os.cpu_count()}")
+    
+    expected, elapsed = timed(lambda: serial_forecasts(sources))
+    print(f"{'serial summaries':<20}{elapsed * 1000:10.1f} ms")
+    for workers in WORKER_COUNTS:
+        result, elapsed = timed(lambda: forecast_blocks(sources, workers=workers))
+        equal = list(result) == list(expected) and repr(result) == repr(expected)
+        print(f"{f'{workers} worker(s)':<20}{elapsed * 1000:10.1f} ms  equal={equal}")
+
+
+if __name__ == '__main__':
+    main()
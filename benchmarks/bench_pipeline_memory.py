@@ -0,0 +1,35 @@
+"""
+Benchmark: per-stage peak memory of the pipeline with and without copies.
+
+Usage:
+    python benchmarks/bench_pipeline_memory.py [n_rows]
+"""
+
+import sys
+
+import pandas as pd
+
+from _synthetic import make_meter_frame
+
+from pipeline import run_pipeline
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    df = make_meter_frame(n_rows)
+    
+    pd.set_option('display.width', 120)
+    for copy in (True, False):
+        # Tracing slows allocations down, so timings come from a second,
+        # untraced run
+        _, report = run_pipeline(df, 'units_consumed', copy=copy)
+        _, timing = run_pipeline(df, 'units_consumed', copy=copy, track_memory=False)
+        report['seconds'] = timing['seconds']
+        print(f"\ncopy={copy}  (input frame {df.memory_usage(deep=True).sum() / 1e6:.1f} MB)")
+        print(report.round(3).to_string(index=False))
+        print(f"Largest stage peak: {report['peak_mb'].max():.1f} MB  "
+              f"total time: {report['seconds'].sum():.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: one block over one month - CSV path vs. SQLite filter pushdown.
+
+The CSV path loads the whole file (warm Parquet cache), preprocesses it and
+filters in pandas; the SQLite path asks the indexed database for the rows.
+
+Usage:
+    python benchmarks/bench_sqlite_backend.py [n_rows] [n_blocks]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from _synthetic import write_meter_csv
+
+from data_loader import load_electricity_data
+from data_preprocessing import preprocess_data, filter_by_block, filter_by_date_range
+from storage import import_csv_to_db
+
+
+def csv_path_query(csv_path, block, start, end):
+    df = preprocess_data(load_electricity_data(csv_path))
+    return filter_by_date_range(filter_by_block(df, block), start, end)
+
+
+def db_path_query(db_path, block, start, end):
+    return load_electricity_data(
+        db_path=db_path, hostel_block=block, start_date=start, end_date=end
+    )
+
+
+def best_of(func, *args, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    n_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    block, start, end = 'B0007', '2003-03-01', '2003-03-31'
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'electricity_data.csv')
+        db_path = os.path.join(tmp, 'hostel_data.db')
+        write_meter_csv(csv_path, n_rows, n_blocks)
+        
+        t0 = time.perf_counter()
+        import_csv_to_db(csv_path, 'electricity', db_path)
+        import_time = time.perf_counter() - t0
+        
+        load_electricity_data(csv_path)  # warm the Parquet cache
+        csv_rows, csv_time = best_of(csv_path_query, csv_path, block, start, end)
+        db_rows, db_time = best_of(db_path_query, db_path, block, start, end)
+        
+        assert len(csv_rows) == len(db_rows)
+        print(f"Rows: {n_rows:,}  blocks: {n_blocks}  selected rows: {len(db_rows)}")
+        print(f"{'One-time import':<30}{import_time:8.3f} s")
+        print(f"{'CSV + pandas filtering':<30}{csv_time:8.3f} s")
+        print(f"{'SQLite pushdown':<30}{db_time:8.4f} s")
+        print(f"Speed-up: {csv_time / db_time:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: per-statistic pandas passes vs. the fused statistics kernel,
+and separate statistics + compare_blocks vs. one grouped computation.
+
+Usage:
+    python benchmarks/bench_statistics.py [n_rows] [n_blocks]
+"""
+
+import sys
+import time
+
+from _synthetic import make_meter_frame
+
+from analysis import calculate_statistics, calculate_grouped_statistics, compare_blocks
+from data_preprocessing import build_block_index
+
+
+def pandas_statistics(df, consumption_col):
+    """The seven separate passes calculate_statistics used to make."""
+    column = df[consumption_col]
+    return {
+        'average': column.mean(),
+        'maximum': column.max(),
+        'minimum': column.min(),
+        'median': column.median(),
+        'std_dev': column.std(),
+        'total': column.sum(),
+        'count': len(df)
+    }
+
+
+def best_of(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    n_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    col = 'units_consumed'
+    
+    df = make_meter_frame(n_rows, n_blocks, col)
+    block_index = build_block_index(df)
+    
+    cases = [
+        ("pandas, 7 passes", lambda: pandas_statistics(df, col)),
+        ("fused kernel", lambda: calculate_statistics(df, col)),
+        ("pandas + compare_blocks", lambda: (pandas_statistics(df, col), compare_blocks(df, col))),
+        ("grouped kernel (all blocks)", lambda: calculate_grouped_statistics(df, col, block_index)),
+    ]
+    
+    print(f"Rows: {len(df):,}  blocks: {n_blocks}")
+    for name, func in cases:
+        print(f"{name:<30}{best_of(func) * 1000:10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,77 +5,779 @@ This module performs statistical analysis and anomaly detection.
 
 import pandas as pd
 import numpy as np
+from pandas.api.indexers import BaseIndexer
 
+from data_preprocessing import build_block_index
 
-def calculate_statistics(df, consumption_col):
+
+# Statistics reported by calculate_statistics, in display order
+STATISTIC_NAMES = ['average', 'maximum', 'minimum', 'median', 'std_dev', 'total', 'count']
+
+# Values are reduced in blocks small enough to stay in CPU cache, so the
+# sum, min, max and squared-deviation reductions of a block all read it
+# from cache and the array is streamed from memory only once
+_KERNEL_BLOCK_SIZE = 1 << 15
+
+# Labels of the anomaly_type column (categories of the categorical dtype)
+ANOMALY_NORMAL = 'Normal'
+ANOMALY_HIGH = 'High Usage'
+ANOMALY_LOW = 'Low Usage'
+ANOMALY_TYPE_DTYPE = pd.CategoricalDtype([ANOMALY_NORMAL, ANOMALY_HIGH, ANOMALY_LOW])
+
+# Anomaly detection methods: mean/standard deviation or median/MAD
+ANOMALY_METHODS = ('std', 'mad')
+
+# Scales the MAD to the standard deviation of normally distributed data
+MAD_SCALE = 1.4826
+
+
+def statistics_kernel(values):
+    """
+    Compute all summary statistics of an array in two passes.
+    The first, cache-blocked pass produces total, minimum, maximum, mean
+    and the sum of squared deviations (merged across blocks with Chan's
+    formula); the second is the selection for the median. NaNs are ignored.
+    
+    Args:
+        values (numpy.array): Consumption values
+        
+    Returns:
+        dict: average, maximum, minimum, median, std_dev, total and count
+            (count of non-missing values)
+    """
+    values = np.asarray(values)
+    
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    total = values.dtype.type(0)
+    minimum = maximum = None
+    
+    for start in range(0, len(values), _KERNEL_BLOCK_SIZE):
+        block = values[start:start + _KERNEL_BLOCK_SIZE]
+        block_total = block.sum()
+        block_mean = block_total / len(block)
+        deviations = block - block_mean
+        block_m2 = float(np.dot(deviations, deviations))
+        
+        # Chan et al. parallel update of (count, mean, M2)
+        merged = count + len(block)
+        delta = block_mean - mean
+        mean += delta * len(block) / merged
+        m2 += block_m2 + delta * delta * count * len(block) / merged
+        count = merged
+        
+        total += block_total
+        block_min, block_max = block.min(), block.max()
+        minimum = block_min if minimum is None else min(minimum, block_min)
+        maximum = block_max if maximum is None else max(maximum, block_max)
+    
+    if values.dtype.kind == 'f' and np.isnan(total):
+        # NaNs poison every reduction; drop them and start again
+        return statistics_kernel(values[~np.isnan(values)])
+    
+    if count == 0:
+        return {
+            'average': np.nan, 'maximum': np.nan, 'minimum': np.nan,
+            'median': np.nan, 'std_dev': np.nan, 'total': total, 'count': 0
+        }
+    
+    return {
+        'average': total / count,
+        'maximum': maximum,
+        'minimum': minimum,
+        'median': np.median(values),
+        'std_dev': np.sqrt(m2 / (count - 1)) if count > 1 else np.nan,
+        'total': total,
+        'count': count
+    }
+
+
+def calculate_statistics(df, consumption_col, accumulator=None):
     """
     Calculate basic statistics for consumption data.
     
     Args:
         df (pandas.DataFrame): Input dataframe
         consumption_col (str): Name of consumption column
+        accumulator (online_stats.RunningStats): Running statistics of the
+            same data; when given the frame is not scanned and the median
+            is reported as None
         
     Returns:
         dict: Dictionary containing statistics
     """
+    if accumulator is not None and accumulator.count > 0:
+        return accumulator.to_dict()
+    
     if df is None or len(df) == 0 or consumption_col not in df.columns:
         return None
     
-    stats = {
-        'average': df[consumption_col].mean(),
-        'maximum': df[consumption_col].max(),
-        'minimum': df[consumption_col].min(),
-        'median': df[consumption_col].median(),
-        'std_dev': df[consumption_col].std(),
-        'total': df[consumption_col].sum(),
+    stats = statistics_kernel(df[consumption_col].to_numpy())
+    stats['count'] = len(df)
+    
+    return stats
+
+
+def calculate_grouped_statistics(df, consumption_col, block_index=None):
+    """
+    Calculate statistics for every hostel block and for the whole data
+    in one call. Blocks are contiguous row ranges, so every moment is a
+    single segmented reduction (reduceat) over all blocks at once, and
+    the overall figures are merged from the per-block results.
+    
+    Args:
+        df (pandas.DataFrame): Input dataframe with hostel_block column
+        consumption_col (str): Name of consumption column
+        block_index (dict): Optional partition index from build_block_index
+        
+    Returns:
+        tuple: (block_stats, overall) - a DataFrame indexed by hostel_block
+            with one column per statistic, and a dict of the overall
+            statistics as returned by calculate_statistics
+    """
+    if df is None or len(df) == 0 or consumption_col not in df.columns:
+        return None, None
+    
+    if block_index is None:
+        try:
+            block_index = build_block_index(df)
+        except ValueError:
+            df = df.sort_values('hostel_block', kind='stable')
+            block_index = build_block_index(df)
+    
+    labels = list(block_index)
+    bounds = np.array(list(block_index.values()), dtype=np.intp).reshape(-1, 2)
+    starts, stops = bounds[:, 0], bounds[:, 1]
+    values = df[consumption_col].to_numpy()
+    
+    if values.dtype.kind == 'f':
+        valid = ~np.isnan(values)
+        if not valid.all():
+            # Compact away NaNs and shift the block ranges accordingly
+            valid_counts = np.add.reduceat(valid, starts)
+            values = values[valid]
+            stops = np.cumsum(valid_counts)
+            starts = stops - valid_counts
+    
+    counts = stops - starts
+    filled = counts > 0
+    segment_starts = starts[filled]
+    
+    totals = np.zeros(len(labels), dtype=values.dtype)
+    minima = np.full(len(labels), np.nan)
+    maxima = np.full(len(labels), np.nan)
+    m2 = np.zeros(len(labels))
+    
+    if len(values):
+        if values.dtype.kind == 'f':
+            # Same compensated summation, in the same order, as
+            # DataFrame.groupby(...).sum(), so the totals and means match
+            # compare_blocks bit for bit
+            codes = np.repeat(np.flatnonzero(filled), counts[filled])
+            totals[filled] = pd.Series(values).groupby(codes, sort=False).sum().to_numpy()
+        else:
+            totals[filled] = np.add.reduceat(values, segment_starts)
+        minima[filled] = np.minimum.reduceat(values, segment_starts)
+        maxima[filled] = np.maximum.reduceat(values, segment_starts)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = totals / counts
+        if len(values):
+            deviations = values - np.repeat(means[filled], counts[filled])
+            m2[filled] = np.add.reduceat(deviations * deviations, segment_starts)
+        std_devs = np.where(counts > 1, np.sqrt(m2 / (counts - 1)), np.nan)
+    
+    medians = np.array([
+        np.median(values[start:stop]) if stop > start else np.nan
+        for start, stop in zip(starts, stops)
+    ])
+    
+    if values.dtype.kind in 'iu' and filled.all():
+        minima = minima.astype(values.dtype)
+        maxima = maxima.astype(values.dtype)
+    
+    block_stats = pd.DataFrame({
+        'average': means,
+        'maximum': maxima,
+        'minimum': minima,
+        'median': medians,
+        'std_dev': std_devs,
+        'total': totals,
+        'count': counts
+    }, index=pd.Index(labels, name='hostel_block'))
+    
+    # Merge the per-block moments into the overall figures
+    count = int(counts.sum())
+    total = totals.sum()
+    overall = {
+        'average': total / count if count else np.nan,
+        'maximum': maxima[filled].max() if count else np.nan,
+        'minimum': minima[filled].min() if count else np.nan,
+        'median': np.median(values) if count else np.nan,
+        'std_dev': np.nan,
+        'total': total,
         'count': len(df)
     }
+    if count > 1:
+        mean = total / count
+        spread = m2[filled].sum() + np.sum(counts[filled] * (means[filled] - mean) ** 2)
+        overall['std_dev'] = np.sqrt(spread / (count - 1))
     
-    return stats
+    return block_stats, overall
+
+
+def _consumption_baseline(df, consumption_col, by_block=False, window=None, stats=None):
+    """
+    Mean and standard deviation each reading is compared against.
+    
+    Returns scalars for the global baseline, or per-row arrays when the
+    baseline is computed per block and/or over a rolling window. Grouped
+    modes run as one grouped pass over all blocks (no loop per block).
+    """
+    values = df[consumption_col]
+    
+    if window is None and not by_block:
+        if stats is not None and stats.count > 0:
+            return stats.mean, stats.std_dev
+        return values.mean(), values.std()
+    
+    if window is None:
+        if isinstance(stats, pd.DataFrame):
+            # Per-block table, e.g. StatsRegistry.block_table
+            blocks = df['hostel_block']
+            return (
+                stats['average'].reindex(blocks).to_numpy(dtype=float),
+                stats['std_dev'].reindex(blocks).to_numpy(dtype=float)
+            )
+        grouped = values.groupby(df['hostel_block'], observed=True, sort=False)
+        return (
+            grouped.transform('mean').to_numpy(dtype=float),
+            grouped.transform('std').to_numpy(dtype=float)
+        )
+    
+    rolling = values.rolling(_rolling_window(df, window, by_block), min_periods=2)
+    return rolling.mean().to_numpy(dtype=float), rolling.std().to_numpy(dtype=float)
+
+
+def _robust_baseline(df, consumption_col, by_block=False, window=None):
+    """
+    Median and scaled median absolute deviation (MAD) each reading is
+    compared against; the MAD is scaled to estimate the standard deviation
+    of normal data, so thresholds mean the same as for the std method.
+    
+    Rolling baselines are exact per window: the MAD of a window is the
+    median of its readings' deviations from that window's median.
+    """
+    values = df[consumption_col]
+    
+    if window is None and not by_block:
+        median = values.median()
+        return median, (values - median).abs().median() * MAD_SCALE
+    
+    if window is None:
+        blocks = df['hostel_block']
+        median = values.groupby(blocks, observed=True, sort=False).transform('median')
+        deviation = (values - median).abs()
+        mad = deviation.groupby(blocks, observed=True, sort=False).transform('median')
+        return median.to_numpy(dtype=float), mad.to_numpy(dtype=float) * MAD_SCALE
+    
+    segment_starts = _row_segment_starts(df) if by_block else np.zeros(len(df), dtype=np.int64)
+    median, mad = _rolling_median_mad(values.to_numpy(dtype=float), window, segment_starts)
+    return median, mad * MAD_SCALE
+
+
+class _RankWindow:
+    """
+    Sliding window of readings kept in sorted order: a Fenwick tree over
+    the value ranks of a span of rows, holding 1 for every row of the
+    span that is in the window. Inserting, removing and reading the k-th
+    smallest reading all take O(log span).
+    """
+    
+    __slots__ = ('sorted_values', 'tree', 'top', 'count')
+    
+    def __init__(self, sorted_values, members):
+        """
+        Args:
+            sorted_values (list): Readings of the span, ascending
+            members (numpy.ndarray): 0/1 per sorted position, 1 for the
+                readings initially in the window
+        """
+        size = 1 << max(len(sorted_values) - 1, 1).bit_length()
+        counts = np.zeros(size, dtype=np.int64)
+        counts[:len(members)] = members
+        prefix = np.concatenate([[0], np.cumsum(counts)])
+        index = np.arange(1, size + 1)
+        
+        self.sorted_values = sorted_values
+        self.tree = [0] + (prefix[index] - prefix[index - (index & -index)]).tolist()
+        self.top = size
+        self.count = int(prefix[-1])
+    
+    def add(self, rank, delta):
+        """Insert (delta=1) or remove (delta=-1) the reading of a rank."""
+        tree, size = self.tree, self.top
+        rank += 1
+        while rank <= size:
+            tree[rank] += delta
+            rank += rank & -rank
+        self.count += delta
+    
+    def select(self, k):
+        """k-th smallest reading in the window (1-based)."""
+        tree = self.tree
+        position = 0
+        step = self.top
+        while step:
+            if tree[position + step] < k:
+                position += step
+                k -= tree[position]
+            step >>= 1
+        return self.sorted_values[position]
+    
+    def median_mad(self, split):
+        """
+        Median and (unscaled) MAD of the window.
+        
+        The deviations are two sorted sequences, the readings below the
+        median walking down and the readings from it walking up, so the
+        MAD is the k-th smallest of two sorted sequences: an O(log w)
+        search for how many of them come from the lower side, started
+        from the previous window's answer (``split``).
+        
+        Returns:
+            tuple: (median, mad, split)
+        """
+        # The search reads most ranks twice; remember them for this window
+        selected = {}
+        
+        def select(k):
+            value = selected.get(k)
+            if value is None:
+                value = selected[k] = self.select(k)
+            return value
+        
+        count = self.count
+        half = count // 2
+        if count & 1:
+            median = select(half + 1)
+            k = half + 1
+        else:
+            median = (select(half) + select(half + 1)) / 2
+            k = half
+        
+        # Lower side: median - select(half), median - select(half - 1), ...;
+        # upper side: select(half + 1) - median, select(half + 2) - median, ...
+        def takes_more_lower(i):
+            return median - select(half - i) < select(half + k - i) - median
+        
+        split = _first_false(takes_more_lower, max(0, k - (count - half)), min(k, half), split)
+        lower = median - select(half - split + 1) if split else -np.inf
+        upper = select(half + k - split) - median if k > split else -np.inf
+        mad = max(lower, upper)
+        if not count & 1:
+            # Average with the next smallest deviation
+            lower = median - select(half - split) if split < half else np.inf
+            upper = select(half + k - split + 1) - median if half + k - split < count else np.inf
+            mad = (mad + min(lower, upper)) / 2
+        return median, mad, split
+
+
+def _first_false(predicate, lo, hi, guess):
+    """
+    Smallest i in [lo, hi] where a monotone predicate (true, then false,
+    false at hi) is false, galloping outward from a guess so the cost is
+    logarithmic in the answer's distance from it.
+    """
+    guess = min(max(guess, lo), hi)
+    step = 1
+    if guess < hi and predicate(guess):
+        lo = guess + 1
+        while lo + step - 1 < hi and predicate(lo + step - 1):
+            lo += step
+            step *= 2
+        hi = min(hi, lo + step - 1)
+    else:
+        hi = guess
+        while hi - step >= lo and not predicate(hi - step):
+            hi -= step
+            step *= 2
+        lo = max(lo, hi - step + 1)
+    
+    while lo < hi:
+        middle = (lo + hi) // 2
+        if predicate(middle):
+            lo = middle + 1
+        else:
+            hi = middle
+    return lo
+
+
+def _rolling_median_mad(values, window, segment_starts, chunk_rows=None):
+    """
+    Median and (unscaled) MAD of every trailing window of at most
+    ``window`` readings, not reaching back past the row's segment start.
+    Windows with fewer than 2 readings give NaN, as with min_periods=2.
+    NaN readings are left out of the windows.
+    
+    One sorted window (_RankWindow) slides over each segment; each step
+    inserts the new reading, removes the oldest and reads both order
+    statistics by rank, so the work is O(n log w). Value ranks are taken
+    per chunk of rows (plus the ``window - 1`` rows before it), which
+    keeps the tree at O(w) entries.
+    """
+    n = len(values)
+    median = np.full(n, np.nan)
+    mad = np.full(n, np.nan)
+    chunk_rows = chunk_rows or max(window, 64)
+    present = ~np.isnan(values)
+    segment_bounds = np.append(np.flatnonzero(np.diff(segment_starts, prepend=-1)), n)
+    
+    for segment_start, segment_stop in zip(segment_bounds[:-1], segment_bounds[1:]):
+        for first in range(segment_start, segment_stop, chunk_rows):
+            last = min(first + chunk_rows, segment_stop)
+            span = max(segment_start, first - window + 1)
+            order = np.argsort(values[span:last], kind='stable')
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[order] = np.arange(len(order))
+            members = np.zeros(len(order), dtype=np.int64)
+            members[ranks[:first - span]] = present[span:first]
+            sorted_window = _RankWindow(values[span:last][order].tolist(), members)
+            
+            ranks = ranks.tolist()
+            keep = present[span:last].tolist()
+            split = 0
+            for row in range(first, last):
+                if keep[row - span]:
+                    sorted_window.add(ranks[row - span], 1)
+                if row - window >= span and keep[row - window - span]:
+                    sorted_window.add(ranks[row - window - span], -1)
+                if sorted_window.count >= 2:
+                    median[row], mad[row], split = sorted_window.median_mad(split)
+    
+    return median, mad
+
+
+def _check_anomaly_method(method):
+    """Raise ValueError for an unknown anomaly detection method."""
+    if method not in ANOMALY_METHODS:
+        raise ValueError(f"Unknown anomaly method {method!r}, expected one of {ANOMALY_METHODS}")
+
+
+def _anomaly_baseline(df, consumption_col, stats=None, by_block=False, window=None, method='std'):
+    """Baseline (mean or median) and spread of the readings for a method."""
+    if method == 'mad':
+        return _robust_baseline(df, consumption_col, by_block=by_block, window=window)
+    return _consumption_baseline(
+        df, consumption_col, by_block=by_block, window=window, stats=stats
+    )
 
 
-def detect_anomalies(df, consumption_col, threshold=2.0):
+def _rolling_window(df, window, by_block):
+    """Rolling window spec; per block it never crosses block boundaries."""
+    if not by_block:
+        return window
+    
+    # Blocks are contiguous row ranges, so the windows of all blocks
+    # are bounds of one rolling pass over the column
+    return _SegmentWindowIndexer(window_size=window, segment_starts=_row_segment_starts(df))
+
+
+def _row_segment_starts(df):
+    """First row of every row's block (blocks are contiguous row ranges)."""
+    ranges = sorted(build_block_index(df).values())
+    starts = np.array([start for start, _ in ranges], dtype=np.int64)
+    lengths = np.array([stop - start for start, stop in ranges], dtype=np.int64)
+    return np.repeat(starts, lengths)
+
+
+class _SegmentWindowIndexer(BaseIndexer):
+    """
+    Trailing windows of at most ``window_size`` rows that never reach back
+    past the start of a row's segment (block), so one rolling pass over
+    the whole column computes separate rolling statistics for every block.
+    """
+    
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None,
+                          closed=None, step=None):
+        rows = np.arange(num_values, dtype=np.int64)
+        start = np.maximum(rows - self.window_size + 1, self.segment_starts)
+        return start.astype(np.int64), rows + 1
+
+
+def label_anomalies(values, upper_bound, lower_bound):
+    """
+    Classify readings against their bounds in one select step.
+    
+    Args:
+        values (array-like): Readings
+        upper_bound: Scalar or per-reading upper bounds
+        lower_bound: Scalar or per-reading lower bounds
+    
+    Returns:
+        tuple: (is_anomaly bool array, anomaly_type Categorical)
+    """
+    values = np.asarray(values)
+    high = values > upper_bound
+    low = values < lower_bound
+    codes = np.select([high, low], [1, 2], default=0).astype(np.int8)
+    labels = pd.Categorical.from_codes(codes, dtype=ANOMALY_TYPE_DTYPE)
+    return high | low, labels
+
+
+def detect_anomalies(df, consumption_col, threshold=2.0, copy=True, stats=None,
+                     by_block=False, window=None, method='std'):
     """
     Detect anomalies in consumption data using standard deviation method.
     Data points beyond threshold * std_dev are considered anomalies.
     
+    By default one mean and standard deviation is used for the whole
+    frame. With ``by_block`` every reading is compared with its own
+    block's baseline, and with ``window`` with the mean and standard
+    deviation of the trailing ``window`` readings (per block when
+    ``by_block`` is set; the frame must then be sorted by block and date,
+    as preprocess_data leaves it).
+    
+    With ``method='mad'`` the baseline is the median and the spread is the
+    scaled median absolute deviation, so a few huge spikes cannot inflate
+    the threshold and hide other spikes.
+    
     Args:
         df (pandas.DataFrame): Input dataframe
         consumption_col (str): Name of consumption column
         threshold (float): Number of standard deviations for anomaly threshold
+        copy (bool): Return an independent deep copy; False only adds the
+            anomaly columns on a shallow copy
+        stats: Running statistics of the same data, used instead of
+            rescanning the column: an online_stats.RunningStats for the
+            global baseline, or a per-block table with average and std_dev
+            columns (e.g. StatsRegistry.block_table) with ``by_block``
+        by_block (bool): Use a separate baseline for each hostel block
+        window (int): Number of trailing readings (current one included)
+            in a rolling baseline; None uses all readings
+        method (str): 'std' (mean and standard deviation) or 'mad'
+            (median and median absolute deviation; stats are not used)
         
     Returns:
-        pandas.DataFrame: Dataframe with anomaly flag
+        pandas.DataFrame: Dataframe with anomaly flag and a categorical
+            anomaly_type column
     """
+    _check_anomaly_method(method)
+    
     if df is None or len(df) == 0 or consumption_col not in df.columns:
         return None
     
-    df_anomaly = df.copy()
+    df_anomaly = df.copy(deep=copy)
     
-    # Calculate mean and standard deviation
-    mean = df_anomaly[consumption_col].mean()
-    std_dev = df_anomaly[consumption_col].std()
+    # Calculate the baseline (mean or median) and spread of the readings
+    mean, std_dev = _anomaly_baseline(
+        df_anomaly, consumption_col, stats=stats, by_block=by_block, window=window, method=method
+    )
     
     # Define threshold boundaries
     upper_bound = mean + (threshold * std_dev)
     lower_bound = mean - (threshold * std_dev)
     
     # Flag anomalies
-    df_anomaly['is_anomaly'] = (
-        (df_anomaly[consumption_col] > upper_bound) | 
-        (df_anomaly[consumption_col] < lower_bound)
+    is_anomaly, anomaly_type = label_anomalies(
+        df_anomaly[consumption_col].to_numpy(), upper_bound, lower_bound
     )
-    
-    df_anomaly['anomaly_type'] = 'Normal'
-    df_anomaly.loc[df_anomaly[consumption_col] > upper_bound, 'anomaly_type'] = 'High Usage'
-    df_anomaly.loc[df_anomaly[consumption_col] < lower_bound, 'anomaly_type'] = 'Low Usage'
+    df_anomaly['is_anomaly'] = is_anomaly
+    df_anomaly['anomaly_type'] = anomaly_type
     
     return df_anomaly
 
 
+def compute_zscores(df, consumption_col, stats=None, by_block=False, window=None, method='std'):
+    """
+    Signed distance of every reading from its baseline, in units of the
+    spread (standard deviations, or scaled MADs for ``method='mad'``).
+    A reading is an anomaly at threshold t exactly when abs(z) > t.
+    
+    Args:
+        df (pandas.DataFrame): Input dataframe
+        consumption_col (str): Name of consumption column
+        stats, by_block, window, method: As for detect_anomalies
+    
+    Returns:
+        numpy.ndarray: z-scores (NaN where the spread is undefined)
+    """
+    _check_anomaly_method(method)
+    center, spread = _anomaly_baseline(
+        df, consumption_col, stats=stats, by_block=by_block, window=window, method=method
+    )
+    values = df[consumption_col].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (values - center) / spread
+
+
+class AnomalyThresholdIndex:
+    """
+    Anomaly detection results for every threshold at once.
+    
+    The z-scores are computed and sorted once (high and low side apart);
+    anomaly counts for a threshold are then two binary searches and the
+    flagged rows a slice of the sort order, so sweeping the threshold
+    never rescans or copies the frame.
+    """
+    
+    def __init__(self, df, consumption_col, stats=None, by_block=False, window=None,
+                 method='std'):
+        """
+        Args:
+            df (pandas.DataFrame): Input dataframe (kept by reference)
+            consumption_col (str): Name of consumption column
+            stats, by_block, window, method: As for detect_anomalies
+        """
+        self.df = df
+        self.consumption_col = consumption_col
+        
+        z = compute_zscores(
+            df, consumption_col, stats=stats, by_block=by_block, window=window, method=method
+        )
+        
+        # Rows of each side ordered by increasing distance from the baseline
+        high_rows = np.flatnonzero(z > 0)
+        low_rows = np.flatnonzero(z < 0)
+        high_order = np.argsort(z[high_rows], kind='stable')
+        low_order = np.argsort(-z[low_rows], kind='stable')
+        self._high_rows = high_rows[high_order]
+        self._high_z = z[self._high_rows]
+        self._low_rows = low_rows[low_order]
+        self._low_z = -z[self._low_rows]
+    
+    def _split(self, threshold):
+        """First sorted position beyond the threshold on each side."""
+        return (
+            np.searchsorted(self._high_z, threshold, side='right'),
+            np.searchsorted(self._low_z, threshold, side='right')
+        )
+    
+    def summary(self, threshold):
+        """
+        Anomaly counts at a threshold, in O(log n).
+        
+        Args:
+            threshold (float): Number of standard deviations
+        
+        Returns:
+            dict: Same keys as get_anomalies_summary
+        """
+        high_start, low_start = self._split(threshold)
+        high_count = len(self._high_z) - int(high_start)
+        low_count = len(self._low_z) - int(low_start)
+        total = len(self.df)
+        anomaly_count = high_count + low_count
+        
+        return {
+            'total_records': total,
+            'anomaly_count': anomaly_count,
+            'anomaly_percentage': (anomaly_count / total * 100) if total > 0 else 0,
+            'high_usage_count': high_count,
+            'low_usage_count': low_count
+        }
+    
+    def flags(self, threshold):
+        """
+        Anomaly flags of all rows at a threshold.
+        
+        Returns:
+            tuple: (is_anomaly bool array, anomaly_type Categorical)
+        """
+        high_start, low_start = self._split(threshold)
+        codes = np.zeros(len(self.df), dtype=np.int8)
+        codes[self._high_rows[high_start:]] = 1
+        codes[self._low_rows[low_start:]] = 2
+        return codes > 0, pd.Categorical.from_codes(codes, dtype=ANOMALY_TYPE_DTYPE)
+    
+    def flagged_rows(self, threshold):
+        """
+        Rows flagged at a threshold, in their original order.
+        
+        Args:
+            threshold (float): Number of standard deviations
+        
+        Returns:
+            pandas.DataFrame: Flagged rows with anomaly_type and z_score
+                columns
+        """
+        high_start, low_start = self._split(threshold)
+        high = self._high_rows[high_start:]
+        low = self._low_rows[low_start:]
+        rows = np.concatenate((high, low))
+        labels = np.concatenate((np.ones(len(high), np.int8), np.full(len(low), 2, np.int8)))
+        z = np.concatenate((self._high_z[high_start:], -self._low_z[low_start:]))
+        order = np.argsort(rows, kind='stable')
+        
+        flagged = self.df.iloc[rows[order]].copy()
+        flagged['anomaly_type'] = pd.Categorical.from_codes(labels[order], dtype=ANOMALY_TYPE_DTYPE)
+        flagged['z_score'] = z[order]
+        return flagged
+    
+    def block_summary(self, threshold, by='hostel_block'):
+        """
+        Anomaly summary of every block at a threshold, in one pass.
+        
+        Returns:
+            pandas.DataFrame: As returned by get_grouped_anomalies_summary
+        """
+        _, anomaly_type = self.flags(threshold)
+        labels = pd.DataFrame({by: self.df[by].to_numpy(), 'anomaly_type': anomaly_type})
+        return get_grouped_anomalies_summary(labels, by)
+    
+    def curve(self, thresholds=None):
+        """
+        Anomaly counts for many thresholds in one vectorized call.
+        
+        Args:
+            thresholds (array-like): Thresholds to evaluate; defaults to
+                0 to 5 in steps of 0.1
+        
+        Returns:
+            pandas.DataFrame: threshold, high_usage_count, low_usage_count
+                and anomaly_count columns
+        """
+        if thresholds is None:
+            thresholds = np.round(np.arange(0, 5.01, 0.1), 1)
+        thresholds = np.asarray(thresholds, dtype=float)
+        
+        high = len(self._high_z) - np.searchsorted(self._high_z, thresholds, side='right')
+        low = len(self._low_z) - np.searchsorted(self._low_z, thresholds, side='right')
+        return pd.DataFrame({
+            'threshold': thresholds,
+            'high_usage_count': high,
+            'low_usage_count': low,
+            'anomaly_count': high + low
+        })
+
+
+def _anomaly_label_codes(anomaly_type):
+    """Codes 0/1/2 (Normal/High/Low, -1 unknown) of an anomaly_type column."""
+    if isinstance(anomaly_type.dtype, pd.CategoricalDtype) and anomaly_type.dtype == ANOMALY_TYPE_DTYPE:
+        return anomaly_type.cat.codes.to_numpy()
+    return pd.Categorical(anomaly_type, dtype=ANOMALY_TYPE_DTYPE).codes
+
+
+def _summary_from_counts(label_counts):
+    """Summary columns from per-label counts (rows: groups, cols: labels)."""
+    total = label_counts.sum(axis=-1)
+    anomaly_count = label_counts[..., 1] + label_counts[..., 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage = np.where(total > 0, anomaly_count / total * 100, 0)
+    return {
+        'total_records': total,
+        'anomaly_count': anomaly_count,
+        'anomaly_percentage': percentage,
+        'high_usage_count': label_counts[..., 1],
+        'low_usage_count': label_counts[..., 2]
+    }
+
+
 def get_anomalies_summary(df, consumption_col):
     """
     Get summary of detected anomalies.
+    All counts come from one bincount over the anomaly_type codes.
     
     Args:
         df (pandas.DataFrame): Dataframe with anomaly detection results
@@ -87,19 +789,63 @@ def get_anomalies_summary(df, consumption_col):
     if df is None or 'is_anomaly' not in df.columns:
         return None
     
-    anomalies = df[df['is_anomaly'] == True]
+    codes = _anomaly_label_codes(df['anomaly_type'])
+    _, high_count, low_count = np.bincount(
+        codes[codes >= 0], minlength=len(ANOMALY_TYPE_DTYPE.categories)
+    ).tolist()
+    anomaly_count = high_count + low_count
     
     summary = {
         'total_records': len(df),
-        'anomaly_count': len(anomalies),
-        'anomaly_percentage': (len(anomalies) / len(df) * 100) if len(df) > 0 else 0,
-        'high_usage_count': len(df[df['anomaly_type'] == 'High Usage']),
-        'low_usage_count': len(df[df['anomaly_type'] == 'Low Usage'])
+        'anomaly_count': anomaly_count,
+        'anomaly_percentage': (anomaly_count / len(df) * 100) if len(df) > 0 else 0,
+        'high_usage_count': high_count,
+        'low_usage_count': low_count
     }
     
     return summary
 
 
+def get_grouped_anomalies_summary(df, by='hostel_block'):
+    """
+    Get the anomaly summary of every group (block) in one pass.
+    Group and label codes are combined into one index, so a single
+    bincount yields every count of every group.
+    
+    Args:
+        df: Dataframe with anomaly detection results, or a dict of
+            resource name -> dataframe for a summary per resource and block
+        by (str): Column to group by
+    
+    Returns:
+        pandas.DataFrame: One row per group (indexed by resource and group
+            for a dict) with the get_anomalies_summary keys as columns
+    """
+    if isinstance(df, dict):
+        parts = {
+            resource: get_grouped_anomalies_summary(frame, by)
+            for resource, frame in df.items() if frame is not None
+        }
+        if not parts:
+            return None
+        return pd.concat(parts, names=['resource'])
+    
+    if df is None or 'anomaly_type' not in df.columns:
+        return None
+    
+    n_labels = len(ANOMALY_TYPE_DTYPE.categories)
+    labels = _anomaly_label_codes(df['anomaly_type'])
+    groups, uniques = pd.factorize(df[by], sort=True)
+    valid = (labels >= 0) & (groups >= 0)
+    
+    label_counts = np.bincount(
+        groups[valid] * n_labels + labels[valid], minlength=len(uniques) * n_labels
+    ).reshape(len(uniques), n_labels)
+    
+    index = pd.Index(np.asarray(uniques), name=by)
+    return pd.DataFrame(_summary_from_counts(label_counts), index=index)
+
+
 def analyze_trends(df, consumption_col):
     """
     Analyze consumption trends over time.
@@ -114,32 +860,116 @@ def analyze_trends(df, consumption_col):
     if df is None or len(df) < 2:
         return None
     
-    df_sorted = df.sort_values('date').copy()
+    # Only the two columns involved are sorted (and only when needed); the
+    # sort itself already produces a new frame, so no further copy is needed
+    if df['date'].is_monotonic_increasing:
+        values = df[consumption_col]
+    else:
+        values = df[['date', consumption_col]].sort_values('date')[consumption_col]
     
     # Calculate daily change
-    df_sorted['daily_change'] = df_sorted[consumption_col].diff()
+    daily_change = values.diff()
     
     # Calculate percentage change
-    df_sorted['pct_change'] = df_sorted[consumption_col].pct_change() * 100
+    pct_change = values.pct_change() * 100
     
     trends = {
-        'average_daily_change': df_sorted['daily_change'].mean(),
-        'max_increase': df_sorted['daily_change'].max(),
-        'max_decrease': df_sorted['daily_change'].min(),
-        'average_pct_change': df_sorted['pct_change'].mean(),
-        'is_increasing': df_sorted[consumption_col].iloc[-1] > df_sorted[consumption_col].iloc[0]
+        'average_daily_change': daily_change.mean(),
+        'max_increase': daily_change.max(),
+        'max_decrease': daily_change.min(),
+        'average_pct_change': pct_change.mean(),
+        'is_increasing': values.iloc[-1] > values.iloc[0]
     }
     
     return trends
 
 
-def compare_blocks(df, consumption_col):
+def analyze_block_trends(df, consumption_col, block_index=None):
+    """
+    Analyze consumption trends of every hostel block in one pass.
+    
+    Relies on the ``hostel_block, date`` order left by preprocess_data:
+    day-to-day changes are one diff over the whole column with the
+    differences across block boundaries masked out, and every per-block
+    figure is a segmented reduction (reduceat). Frames in another order
+    are sorted first.
+    
+    Args:
+        df (pandas.DataFrame): Input dataframe with date and hostel_block columns
+        consumption_col (str): Name of consumption column
+        block_index (dict): Optional partition index from build_block_index
+        
+    Returns:
+        pandas.DataFrame: One row per hostel_block with the analyze_trends
+            keys as columns (NaN changes for single-reading blocks)
+    """
+    if df is None or len(df) == 0:
+        return None
+    
+    if block_index is None:
+        try:
+            block_index = build_block_index(df)
+        except ValueError:
+            df = df.sort_values(['hostel_block', 'date'], kind='stable')
+            block_index = build_block_index(df)
+    
+    labels = list(block_index)
+    bounds = np.array(list(block_index.values()), dtype=np.intp).reshape(-1, 2)
+    order = np.argsort(bounds[:, 0], kind='stable')
+    labels = [labels[i] for i in order]
+    starts, stops = bounds[order, 0], bounds[order, 1]
+    
+    dates = df['date'].to_numpy()
+    date_steps = np.diff(dates)
+    date_steps[stops[:-1] - 1] = np.timedelta64(0)
+    if (date_steps < np.timedelta64(0)).any():
+        df = df.sort_values(['hostel_block', 'date'], kind='stable')
+        return analyze_block_trends(df, consumption_col)
+    
+    values = df[consumption_col].to_numpy(dtype=float)
+    
+    # change[i] is the change from row i to row i + 1; the last row of
+    # every block has no successor in its block
+    change = np.empty(len(values))
+    change[:-1] = np.diff(values)
+    change[stops - 1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = np.empty(len(values))
+        pct_change[:-1] = change[:-1] / values[:-1] * 100
+        pct_change[stops - 1] = np.nan
+    
+    def segment_mean(x):
+        valid = ~np.isnan(x)
+        counts = np.add.reduceat(valid, starts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.add.reduceat(np.where(valid, x, 0), starts) / counts
+    
+    trends = pd.DataFrame({
+        'average_daily_change': segment_mean(change),
+        'max_increase': np.fmax.reduceat(change, starts),
+        'max_decrease': np.fmin.reduceat(change, starts),
+        'average_pct_change': segment_mean(pct_change),
+        'is_increasing': values[stops - 1] > values[starts]
+    }, index=pd.Index(labels, name='hostel_block'))
+    
+    return trends
+
+
+def compare_blocks(df, consumption_col, block_stats=None):
     """
     Compare consumption between different hostel blocks.
     
     Args:
         df (pandas.DataFrame): Input dataframe with hostel_block column
         consumption_col (str): Name of consumption column
+        block_stats (pandas.DataFrame): Optional per-block statistics, reused
+            instead of scanning df. The Average is taken as total / count,
+            like the groupby mean, so the table from
+            calculate_grouped_statistics is identical to the scan. Tables
+            kept incrementally (StatsRegistry.block_table,
+            RollupCube.block_table) add float readings in arrival order,
+            so their Total and Average can differ from a scan in the last
+            bits, and rarely in the rounded second decimal.
         
     Returns:
         pandas.DataFrame: Comparison summary
@@ -147,7 +977,17 @@ def compare_blocks(df, consumption_col):
     if df is None or 'hostel_block' not in df.columns:
         return None
     
-    comparison = df.groupby('hostel_block')[consumption_col].agg([
+    if block_stats is not None:
+        comparison = pd.DataFrame({
+            'Average': block_stats['total'] / block_stats['count'],
+            'Maximum': block_stats['maximum'],
+            'Minimum': block_stats['minimum'],
+            'Total': block_stats['total'],
+            'Count': block_stats['count']
+        })
+        return comparison.round(2)
+    
+    comparison = df.groupby('hostel_block', observed=True)[consumption_col].agg([
         ('Average', 'mean'),
         ('Maximum', 'max'),
         ('Minimum', 'min'),
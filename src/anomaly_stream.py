@@ -0,0 +1,222 @@
+"""
+Anomaly Stream Module
+This module detects anomalies in a live feed of meter readings, one
+reading at a time.
+
+Every hostel block keeps an exponentially weighted mean and variance.
+A reading is compared with its block's state before the state absorbs it,
+so classification costs O(1) time and memory per reading however long
+the history is. The state can be checkpointed to a JSON file and restored
+after a restart instead of replaying the history.
+"""
+
+import json
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from analysis import ANOMALY_NORMAL, ANOMALY_HIGH, ANOMALY_LOW
+from atomic_write import atomic_write
+
+
+# Block id types a checkpoint can restore (JSON keeps only the text)
+_BLOCK_TYPES = {'str': str, 'int': int, 'float': float, 'bool': bool}
+
+
+def _encode_block(block):
+    """Block id as (type name, value) for a JSON checkpoint."""
+    if isinstance(block, np.generic):
+        block = block.item()
+    type_name = type(block).__name__
+    if type_name not in _BLOCK_TYPES:
+        raise ValueError(f"Cannot checkpoint block id {block!r} of type {type_name}")
+    return type_name, block
+
+
+class StreamingAnomalyDetector:
+    """
+    Per-block exponentially weighted anomaly detector.
+    
+    Attributes:
+        alpha (float): Weight of the newest reading (0 < alpha <= 1)
+        threshold (float): Number of standard deviations for anomaly threshold
+        warmup (int): Readings a block needs before it can raise alerts
+    """
+    
+    def __init__(self, alpha=0.1, threshold=2.0, warmup=10):
+        """
+        Args:
+            alpha (float): Smoothing factor of the weighted mean and variance
+            threshold (float): Number of standard deviations for anomaly threshold
+            warmup (int): Readings per block before alerts are raised
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        # block -> [count, mean, variance, last processed date or None]
+        self._state = {}
+    
+    def classify(self, hostel_block, value):
+        """
+        Classify one reading and absorb it into its block's state.
+        
+        Args:
+            hostel_block (str): Hostel block of the reading
+            value (float): Consumption value
+        
+        Returns:
+            tuple: (label, expected, std_dev) where label is one of the
+                anomaly_type labels of analysis.detect_anomalies and
+                expected/std_dev describe the state before this reading
+        """
+        state = self._state.get(hostel_block)
+        if state is None:
+            self._state[hostel_block] = [1, float(value), 0.0, None]
+            return ANOMALY_NORMAL, float(value), 0.0
+        
+        count, mean, variance, _ = state
+        std_dev = math.sqrt(variance)
+        
+        label = ANOMALY_NORMAL
+        if count >= self.warmup:
+            if value > mean + self.threshold * std_dev:
+                label = ANOMALY_HIGH
+            elif value < mean - self.threshold * std_dev:
+                label = ANOMALY_LOW
+        
+        # Incremental exponentially weighted mean and variance
+        diff = value - mean
+        increment = self.alpha * diff
+        state[0] = count + 1
+        state[1] = mean + increment
+        state[2] = (1 - self.alpha) * (variance + diff * increment)
+        
+        return label, mean, std_dev
+    
+    def process(self, readings):
+        """
+        Classify a stream of readings and yield alerts as they occur.
+        
+        Readings at or before a block's last processed date are skipped,
+        so a feed can be replayed after restoring a checkpoint.
+        
+        Args:
+            readings (iterable): (date, hostel_block, value) tuples, e.g.
+                from a generator following the meter log
+        
+        Yields:
+            dict: Alert with date, hostel_block, value, anomaly_type,
+                expected and std_dev for every High/Low Usage reading
+        """
+        for date, hostel_block, value in readings:
+            if value != value:  # NaN
+                continue
+            
+            day = None
+            if date is not None:
+                day = date if isinstance(date, datetime) else pd.Timestamp(date)
+                state = self._state.get(hostel_block)
+                if state is not None and state[3] is not None and day <= state[3]:
+                    continue
+            
+            label, expected, std_dev = self.classify(hostel_block, value)
+            if day is not None:
+                self._state[hostel_block][3] = day
+            
+            if label != ANOMALY_NORMAL:
+                yield {
+                    'date': date,
+                    'hostel_block': hostel_block,
+                    'value': value,
+                    'anomaly_type': label,
+                    'expected': expected,
+                    'std_dev': std_dev
+                }
+    
+    def process_frame(self, df, consumption_col):
+        """
+        Classify the rows of a frame (e.g. IncrementalCSVReader.last_appended).
+        
+        Args:
+            df (pandas.DataFrame): Readings with date and hostel_block columns
+            consumption_col (str): Name of consumption column
+        
+        Returns:
+            list: Alerts, as yielded by process
+        """
+        if df is None or len(df) == 0:
+            return []
+        readings = zip(
+            df['date'].tolist(), df['hostel_block'].tolist(), df[consumption_col].tolist()
+        )
+        return list(self.process(readings))
+    
+    def block_state(self, hostel_block):
+        """
+        Current state of one block.
+        
+        Returns:
+            dict: count, mean, std_dev and last_date (None if unknown block)
+        """
+        state = self._state.get(hostel_block)
+        if state is None:
+            return None
+        count, mean, variance, last_date = state
+        return {'count': count, 'mean': mean, 'std_dev': math.sqrt(variance), 'last_date': last_date}
+    
+    def save(self, path):
+        """
+        Checkpoint the detector to a JSON file.
+        The file is written to a unique temporary name and moved into
+        place, so a crash or a concurrent save never leaves a torn
+        checkpoint behind. Block ids keep their type (str, int, float or
+        bool; NumPy scalars are stored as the matching Python type).
+        
+        Args:
+            path (str): Checkpoint file path
+        """
+        checkpoint = {
+            'alpha': self.alpha,
+            'threshold': self.threshold,
+            'warmup': self.warmup,
+            'blocks': []
+        }
+        for block, (count, mean, variance, last_date) in self._state.items():
+            block_type, block = _encode_block(block)
+            checkpoint['blocks'].append({
+                'block': block, 'block_type': block_type,
+                'count': count, 'mean': mean, 'variance': variance,
+                'last_date': None if last_date is None else last_date.isoformat()
+            })
+        
+        with atomic_write(path, 'w') as f:
+            json.dump(checkpoint, f)
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Restore a detector from a checkpoint written by save.
+        
+        Args:
+            path (str): Checkpoint file path
+        
+        Returns:
+            StreamingAnomalyDetector: Detector with the saved state
+        """
+        with open(path) as f:
+            checkpoint = json.load(f)
+        
+        detector = cls(checkpoint['alpha'], checkpoint['threshold'], checkpoint['warmup'])
+        detector._state = {
+            _BLOCK_TYPES[state['block_type']](state['block']): [
+                state['count'], state['mean'], state['variance'],
+                None if state['last_date'] is None else pd.Timestamp(state['last_date'])
+            ]
+            for state in checkpoint['blocks']
+        }
+        return detector
@@ -0,0 +1,61 @@
+"""
+Atomic Write Module
+This module replaces cache and checkpoint files atomically.
+
+A file is written to a unique temporary name in its target directory and
+moved into place with os.replace, so readers never see a partially
+written file and a crash leaves the previous version intact. The
+temporary file is created with mode 0666, which the kernel reduces by
+the process umask exactly as for a plain open(); permissions are never
+copied from the directory or from other files.
+"""
+
+import os
+import secrets
+from contextlib import contextmanager
+
+
+# Attempts at a temporary name that does not exist yet
+_MAX_ATTEMPTS = 100
+
+
+def _create_temporary(path):
+    """
+    Create an empty, exclusively opened temporary file next to a path.
+    
+    Returns:
+        tuple: (file descriptor, temporary path)
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    for _ in range(_MAX_ATTEMPTS):
+        tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(8)}.tmp")
+        try:
+            # O_EXCL never follows or reuses an existing file (or symlink)
+            return os.open(tmp_path, flags, 0o666), tmp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No unused temporary name for {path}")
+
+
+@contextmanager
+def atomic_write(path, mode='wb'):
+    """
+    Open a file for writing that replaces ``path`` only when complete.
+    
+    Args:
+        path (str): File to replace
+        mode (str): 'wb' or 'w'
+    
+    Yields:
+        file: Open temporary file; it is moved to ``path`` when the block
+            exits normally and removed when it raises
+    """
+    fd, tmp_path = _create_temporary(path)
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,181 @@
+"""
+Backtest Module
+This module evaluates the prediction model with rolling-origin
+(time-series) backtesting instead of a random train/test split.
+
+At every forecast origin the model is fitted only on readings before it,
+on an expanding window from the block's first reading or a sliding
+window of fixed length, and scored on the readings 1..h days later.
+Every fold is fitted from differences of per-block prefix sums of the day
+index and consumption, so all folds of all blocks are solved at once in
+O(1) each instead of being refitted from scratch. Blocks can also be sharded across
+a process pool; per-block error sums are merged by addition.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from prediction import block_series_layout
+
+
+# Days ahead scored by default
+DEFAULT_HORIZONS = (1, 7, 30)
+
+# Error sums kept per block and horizon: folds, sum of absolute errors,
+# sum of squared errors, sum of errors, sum of absolute percentage errors
+# and the number of folds with a non-zero actual value
+_SUMS = ['folds', 'abs_error', 'sq_error', 'error', 'pct_error', 'pct_folds']
+
+
+def _check_backtest_args(horizons, min_train, window, step):
+    """Validate backtest parameters."""
+    if min_train < 2:
+        raise ValueError(f"min_train must be at least 2, got {min_train}")
+    if window is not None and window < min_train:
+        raise ValueError(f"window ({window}) must be at least min_train ({min_train})")
+    if step < 1:
+        raise ValueError(f"step must be at least 1, got {step}")
+    if len(horizons) == 0 or min(horizons) < 1:
+        raise ValueError(f"horizons must be positive day counts, got {horizons}")
+
+
+def _backtest_sums(values, lengths, horizons, min_train, window, step):
+    """
+    Error sums of every block and horizon.
+    
+    Args:
+        values (numpy.ndarray): Consumption of all blocks, block after block
+            in date order
+        lengths (numpy.ndarray): Number of readings of every block
+        horizons (tuple): Days ahead to score
+        min_train (int): Readings the first fold is trained on
+        window (int): Sliding window length (None: expanding window)
+        step (int): Days between forecast origins
+    
+    Returns:
+        numpy.ndarray: Shape (blocks, horizons, len(_SUMS))
+    """
+    n_blocks = len(lengths)
+    sums = np.zeros((n_blocks, len(horizons), len(_SUMS)))
+    if n_blocks == 0:
+        return sums
+    
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    row_block = np.repeat(np.arange(n_blocks), lengths)
+    
+    # Day index and consumption of every row, centred per block, and their
+    # prefix sums accumulated from zero within each block, so a block's
+    # sums never include the (large) totals of the blocks before it.
+    # Block b's prefixes sit at base[b] .. base[b] + lengths[b], with a
+    # leading zero.
+    day = np.arange(len(values)) - starts[row_block] + 1
+    x = day - (lengths[row_block] + 1) / 2
+    y = values - (np.bincount(row_block, values, minlength=n_blocks) / lengths)[row_block]
+    base = starts + np.arange(n_blocks)
+    
+    def prefix(column):
+        sums = np.zeros(len(column) + n_blocks)
+        sums[np.arange(len(column)) + row_block + 1] = pd.Series(column).groupby(row_block).cumsum()
+        return sums
+    
+    prefix_x, prefix_y = prefix(x), prefix(y)
+    prefix_xx, prefix_xy = prefix(x * x), prefix(x * y)
+    
+    # Forecast origins: the fold at origin t trains on positions [a, t)
+    origins = np.where(lengths > min_train, (lengths - 1 - min_train) // step + 1, 0)
+    fold_block = np.repeat(np.arange(n_blocks), origins)
+    first_fold = np.repeat(np.cumsum(origins) - origins, origins)
+    t = min_train + (np.arange(len(fold_block)) - first_fold) * step
+    a = np.zeros_like(t) if window is None else np.maximum(t - window, 0)
+    lo = base[fold_block] + a
+    hi = base[fold_block] + t
+    
+    # Closed-form least squares of every fold from prefix-sum differences
+    m = hi - lo
+    sum_x = prefix_x[hi] - prefix_x[lo]
+    x_mean = sum_x / m
+    y_mean = (prefix_y[hi] - prefix_y[lo]) / m
+    sxx = prefix_xx[hi] - prefix_xx[lo] - sum_x * x_mean
+    sxy = prefix_xy[hi] - prefix_xy[lo] - sum_x * y_mean
+    slope = sxy / sxx
+    
+    for column, h in enumerate(horizons):
+        valid = t + h <= lengths[fold_block]
+        blocks = fold_block[valid]
+        target = starts[blocks] + t[valid] + h - 1
+        actual = values[target]
+        error = y_mean[valid] + slope[valid] * (x[target] - x_mean[valid]) - y[target]
+        nonzero = actual != 0
+        pct_error = np.zeros_like(error)
+        pct_error[nonzero] = np.abs(error[nonzero] / actual[nonzero])
+        
+        for i, weights in enumerate([None, np.abs(error), error ** 2, error, pct_error, nonzero]):
+            sums[:, column, i] = np.bincount(blocks, weights, minlength=n_blocks)
+    
+    return sums
+
+
+def _metrics_table(sums, index):
+    """Turn error sums into folds, mae, rmse, mape (%) and bias columns."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        folds = sums[..., 0]
+        table = pd.DataFrame({
+            'folds': folds.astype(int),
+            'mae': sums[..., 1] / folds,
+            'rmse': np.sqrt(sums[..., 2] / folds),
+            'mape': 100 * sums[..., 4] / sums[..., 5],
+            'bias': sums[..., 3] / folds
+        }, index=index)
+    return table
+
+
+def backtest(df, consumption_col, horizons=DEFAULT_HORIZONS, min_train=14, window=None,
+             step=1, by_block=False, block_index=None, workers=1):
+    """
+    Rolling-origin backtest of the prediction model.
+    
+    Args:
+        df (pandas.DataFrame): Input dataframe (preprocess_data output)
+        consumption_col (str): Name of consumption column
+        horizons (tuple): Days ahead to score
+        min_train (int): Readings the first fold of every block is trained on
+        window (int): Train on the last `window` readings only (sliding
+            window); None trains on all earlier readings (expanding window)
+        step (int): Days between consecutive forecast origins
+        by_block (bool): Report every block separately
+        block_index (dict): Optional partition index from build_block_index
+        workers (int): Worker processes the blocks are sharded across
+            (1 runs in this process)
+    
+    Returns:
+        pandas.DataFrame: folds, mae, rmse, mape (%) and bias per horizon,
+            indexed by horizon (or by hostel_block and horizon)
+    """
+    horizons = tuple(int(h) for h in horizons)
+    _check_backtest_args(horizons, min_train, window, step)
+    if df is None or len(df) == 0:
+        return None
+    
+    df, labels, starts, stops = block_series_layout(df, block_index)
+    values = df[consumption_col].to_numpy(dtype=float)
+    lengths = stops - starts
+    args = (horizons, min_train, window, step)
+    
+    if workers == 1 or len(labels) < 2:
+        sums = _backtest_sums(values, lengths, *args)
+    else:
+        # Contiguous block shards, each shipped as its own value array
+        bounds = np.linspace(0, len(labels), min(workers, len(labels)) + 1).astype(int)
+        shards = [(values[starts[first]:stops[last - 1]], lengths[first:last])
+                  for first, last in zip(bounds, bounds[1:]) if last > first]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_backtest_sums, shard_values, shard_lengths, *args)
+                       for shard_values, shard_lengths in shards]
+            sums = np.concatenate([future.result() for future in futures])
+    
+    if by_block:
+        index = pd.MultiIndex.from_product([labels, horizons], names=['hostel_block', 'horizon'])
+        return _metrics_table(sums.reshape(-1, len(_SUMS)), index)
+    return _metrics_table(sums.sum(axis=0), pd.Index(horizons, name='horizon'))
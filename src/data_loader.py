@@ -2,68 +2,613 @@
 Data Loader Module
 This module handles loading data from CSV files.
 Simulates IoT data ingestion without actual hardware.
+
+Parsed CSV files are cached next to the source as Parquet files
+(``<file>.cache.parquet``) so repeated loads skip text parsing. The cache
+is keyed on the source file's path, size and modification time and is
+rebuilt automatically when the CSV changes.
+
+Very large meter logs can be streamed in bounded-size chunks
+(``chunksize``) with dtypes pinned up front, so peak memory while parsing
+depends on the chunk size instead of the file size.
+
+``IncrementalCSVReader`` follows a growing meter log: it remembers the
+byte offset and last record it has seen and, on refresh, parses only the
+rows appended since then.
+
+When a SQLite database built by ``storage.py`` is given (``db_path``),
+block and date-range filters are pushed down into the query so only the
+requested rows are read.
 """
 
 import pandas as pd
+import numpy as np
+import bisect
+import io
 import os
+import threading
+
+from atomic_write import atomic_write
+from data_preprocessing import build_block_index, preprocess_data
+import storage
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - caching is simply disabled
+    pa = None
+    pq = None
+
+
+CACHE_SUFFIX = '.cache.parquet'
+_CACHE_KEY = b'smart_hostel_source'
+
+
+def _cache_path(file_path):
+    """Return the path of the Parquet cache that belongs to a CSV file."""
+    return file_path + CACHE_SUFFIX
+
+
+def _source_fingerprint(file_path, profile='inferred'):
+    """
+    Build the cache key for a source file.
+    
+    Args:
+        file_path (str): Path to the source CSV file
+        profile (str): Parsing mode, so frames with different dtypes
+            never satisfy each other's cache lookups
+        
+    Returns:
+        bytes: Encoded (path, size, mtime, profile) fingerprint
+    """
+    source = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}|{source.st_size}|{source.st_mtime_ns}|{profile}"
+    return key.encode('utf-8')
+
+
+def _read_cache(file_path, fingerprint):
+    """
+    Read the cached frame for a CSV file if it is still valid.
+    
+    Args:
+        file_path (str): Path to the source CSV file
+        fingerprint (bytes): Current fingerprint of the source file
+        
+    Returns:
+        pandas.DataFrame: Cached data, or None on a miss
+    """
+    cache_file = _cache_path(file_path)
+    if pq is None or not os.path.exists(cache_file):
+        return None
+    
+    try:
+        metadata = pq.read_schema(cache_file).metadata or {}
+        if metadata.get(_CACHE_KEY) != fingerprint:
+            return None
+        return pq.read_table(cache_file).to_pandas()
+    except Exception:
+        # A corrupt or unreadable cache is treated as a miss
+        return None
+
+
+def _write_cache(file_path, df, fingerprint):
+    """
+    Store a parsed frame as the Parquet cache of a CSV file.
+    The file is written to a temporary name and moved into place so
+    concurrent readers never see a partially written cache.
+    
+    Args:
+        file_path (str): Path to the source CSV file
+        df (pandas.DataFrame): Parsed data to cache
+        fingerprint (bytes): Fingerprint of the source file that was read
+    """
+    if pq is None:
+        return
+    
+    cache_file = _cache_path(file_path)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_CACHE_KEY] = fingerprint
+        table = table.replace_schema_metadata(metadata)
+        
+        with atomic_write(cache_file) as f:
+            pq.write_table(table, f)
+    except (OSError, ValueError, TypeError, pa.ArrowException) as e:
+        # Read-only data directories and columns Arrow cannot store (e.g.
+        # mixed int/str object columns) still load, just without caching
+        print(f"⚠️ Could not write cache for {file_path}: {e}")
+
+
+def _clean_chunk(chunk, consumption_col):
+    """
+    Clean one chunk of a streamed CSV file.
+    
+    Args:
+        chunk (pandas.DataFrame): Raw chunk with pinned dtypes
+        consumption_col (str): Name of consumption column
+        
+    Returns:
+        pandas.DataFrame: Chunk with parsed dates and without invalid rows
+    """
+    chunk['date'] = pd.to_datetime(chunk['date'], format='ISO8601', errors='coerce')
+    chunk = chunk.dropna(subset=['date', 'hostel_block', consumption_col])
+    return chunk.drop_duplicates()
+
+
+def _read_csv_in_chunks(file_path, consumption_col, chunksize):
+    """
+    Stream a consumption CSV file in bounded-size chunks.
+    Dtypes of the known columns are fixed before parsing (categorical
+    block, float64 consumption); any other columns are kept and inferred
+    per chunk. Each chunk is cleaned as soon as it is read.
+    
+    Args:
+        file_path (str): Path to the CSV file
+        consumption_col (str): Name of consumption column
+        chunksize (int): Number of rows parsed per chunk
+        
+    Returns:
+        pandas.DataFrame: Cleaned data with the same columns as a full read
+    """
+    reader = pd.read_csv(
+        file_path,
+        dtype={'date': str, 'hostel_block': 'category', consumption_col: 'float64'},
+        chunksize=chunksize
+    )
+    
+    chunks = []
+    with reader:
+        for chunk in reader:
+            chunks.append(_clean_chunk(chunk, consumption_col))
+    
+    if not chunks:
+        empty = pd.read_csv(file_path, nrows=0)
+        return empty.astype({
+            'date': 'datetime64[ns]', 'hostel_block': 'category', consumption_col: 'float64'
+        })
+    
+    # Chunks only know the blocks they contain; align them on one sorted
+    # category set so the concatenated column stays categorical
+    blocks = sorted(set().union(*(c['hostel_block'].cat.categories for c in chunks)))
+    for chunk in chunks:
+        chunk['hostel_block'] = chunk['hostel_block'].cat.set_categories(blocks)
+    
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _read_consumption_csv(file_path, consumption_col, use_cache=True, chunksize=None):
+    """
+    Read a consumption CSV file, using the Parquet cache when possible.
+    
+    Args:
+        file_path (str): Path to the CSV file
+        consumption_col (str): Name of consumption column
+        use_cache (bool): Read from and refresh the Parquet cache
+        chunksize (int): Stream the file in chunks of this many rows
+        
+    Returns:
+        tuple: (df, from_cache) parsed data and whether it came from cache
+    """
+    # Take the fingerprint before reading so a concurrent append
+    # invalidates the cache on the next load instead of being missed
+    profile = 'pinned' if chunksize else 'inferred'
+    fingerprint = _source_fingerprint(file_path, profile)
+    
+    if use_cache:
+        df = _read_cache(file_path, fingerprint)
+        if df is not None:
+            return df, True
+    
+    if chunksize:
+        df = _read_csv_in_chunks(file_path, consumption_col, chunksize)
+    else:
+        df = pd.read_csv(file_path, parse_dates=['date'])
+    
+    if use_cache:
+        _write_cache(file_path, df, fingerprint)
+    
+    return df, False
+
+
+def _filter_rows(df, hostel_block=None, start_date=None, end_date=None):
+    """
+    Apply the filters of storage.load_from_db to a frame read from CSV.
+    
+    Args:
+        df (pandas.DataFrame): Loaded data
+        hostel_block (str): Optional block filter
+        start_date (str): Optional first date (inclusive)
+        end_date (str): Optional last date (inclusive)
+        
+    Returns:
+        pandas.DataFrame: Matching rows (df itself without filters)
+    """
+    if hostel_block is None and not start_date and not end_date:
+        return df
+    
+    mask = pd.Series(True, index=df.index)
+    if hostel_block is not None:
+        mask &= df['hostel_block'].astype(str) == str(hostel_block)
+    days = pd.to_datetime(df['date']).dt.normalize()
+    if start_date:
+        mask &= days >= pd.to_datetime(start_date).normalize()
+    if end_date:
+        mask &= days <= pd.to_datetime(end_date).normalize()
+    return df[mask].reset_index(drop=True)
 
 
-def load_electricity_data(file_path='data/electricity_data.csv'):
+def load_electricity_data(file_path='data/electricity_data.csv', use_cache=True, chunksize=None,
+                         db_path=None, hostel_block=None, start_date=None, end_date=None):
     """
     Load electricity consumption data from CSV file.
     
     Args:
         file_path (str): Path to the electricity data CSV file
+        use_cache (bool): Reuse the Parquet cache next to the CSV file
+        chunksize (int): Optional streaming mode - parse the file in chunks
+            of this many rows with pinned dtypes (all columns are kept)
+        db_path (str): Optional SQLite database to read from instead of CSV
+        hostel_block (str): Optional block filter
+        start_date (str): Optional start date filter, 'YYYY-MM-DD' (inclusive)
+        end_date (str): Optional end date filter, 'YYYY-MM-DD' (inclusive)
         
     Returns:
         pandas.DataFrame: Loaded electricity data
     """
     try:
-        df = pd.read_csv(file_path)
-        print(f"✅ Successfully loaded {len(df)} electricity records")
+        if db_path:
+            df = storage.load_from_db(
+                'electricity', db_path, hostel_block, start_date, end_date
+            )
+            source = " (database)"
+        else:
+            df, from_cache = _read_consumption_csv(
+                file_path, 'units_consumed', use_cache, chunksize
+            )
+            df = _filter_rows(df, hostel_block, start_date, end_date)
+            source = " (cache)" if from_cache else ""
+        print(f"✅ Successfully loaded {len(df)} electricity records{source}")
         return df
     except FileNotFoundError:
-        print(f"❌ Error: File not found - {file_path}")
+        print(f"❌ Error: File not found - {db_path or file_path}")
         return None
     except Exception as e:
         print(f"❌ Error loading electricity data: {e}")
         return None
 
 
-def load_water_data(file_path='data/water_data.csv'):
+def load_water_data(file_path='data/water_data.csv', use_cache=True, chunksize=None,
+                   db_path=None, hostel_block=None, start_date=None, end_date=None):
     """
     Load water consumption data from CSV file.
     
     Args:
         file_path (str): Path to the water data CSV file
+        use_cache (bool): Reuse the Parquet cache next to the CSV file
+        chunksize (int): Optional streaming mode - parse the file in chunks
+            of this many rows with pinned dtypes (all columns are kept)
+        db_path (str): Optional SQLite database to read from instead of CSV
+        hostel_block (str): Optional block filter
+        start_date (str): Optional start date filter, 'YYYY-MM-DD' (inclusive)
+        end_date (str): Optional end date filter, 'YYYY-MM-DD' (inclusive)
         
     Returns:
         pandas.DataFrame: Loaded water data
     """
     try:
-        df = pd.read_csv(file_path)
-        print(f"✅ Successfully loaded {len(df)} water records")
+        if db_path:
+            df = storage.load_from_db(
+                'water', db_path, hostel_block, start_date, end_date
+            )
+            source = " (database)"
+        else:
+            df, from_cache = _read_consumption_csv(
+                file_path, 'liters_used', use_cache, chunksize
+            )
+            df = _filter_rows(df, hostel_block, start_date, end_date)
+            source = " (cache)" if from_cache else ""
+        print(f"✅ Successfully loaded {len(df)} water records{source}")
         return df
     except FileNotFoundError:
-        print(f"❌ Error: File not found - {file_path}")
+        print(f"❌ Error: File not found - {db_path or file_path}")
         return None
     except Exception as e:
         print(f"❌ Error loading water data: {e}")
         return None
 
 
+class IncrementalCSVReader:
+    """
+    Follow an append-only meter CSV file and keep a preprocessed frame of it.
+    
+    The first refresh performs a full (cached) load. Later refreshes read
+    only the bytes appended since the previous refresh, preprocess those
+    rows and merge them into the frame, which stays sorted by
+    ``hostel_block, date``. If the file shrinks or the last record seen is
+    no longer at the remembered offset (the file was rewritten), the reader
+    falls back to a full reload.
+    
+    Attributes:
+        df (pandas.DataFrame): Current preprocessed data
+        last_appended (pandas.DataFrame): Preprocessed rows merged by the
+            most recent refresh (all rows after a full reload)
+        version (int): Incremented every time ``df`` changes
+    
+    Callbacks registered with ``subscribe`` see every change exactly once,
+    which lets streaming consumers (e.g. online_stats.StatsRegistry) keep
+    up with the feed without rescanning ``df``.
+    """
+    
+    # How far back from the offset to look for the last record
+    _TAIL_WINDOW = 4096
+    
+    def __init__(self, file_path, consumption_col, use_cache=True):
+        """
+        Args:
+            file_path (str): Path to the meter CSV file
+            consumption_col (str): Name of consumption column
+            use_cache (bool): Use the Parquet cache for full reloads
+        """
+        self.file_path = file_path
+        self.consumption_col = consumption_col
+        self.use_cache = use_cache
+        self.df = None
+        self.last_appended = None
+        self.version = 0
+        self._offset = 0
+        self._last_record = b''
+        self._columns = None
+        self._block_index = None
+        self._listeners = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, callback):
+        """
+        Register a callback for data changes.
+        
+        The callback is called as ``callback(rows, reloaded)`` with the
+        preprocessed rows merged by a refresh; ``reloaded`` is True when the
+        rows replace everything seen before (full reload). If data is
+        already loaded, the callback immediately receives all of it.
+        
+        Args:
+            callback (callable): Function of (rows, reloaded)
+        """
+        with self._lock:
+            self._listeners.append(callback)
+            if self.df is not None:
+                callback(self.df, True)
+    
+    def _notify(self, rows, reloaded):
+        """Pass changed rows to the subscribed callbacks."""
+        for callback in self._listeners:
+            callback(rows, reloaded)
+    
+    def refresh(self, snapshot=None):
+        """
+        Bring the frame up to date with the file.
+        
+        The frame and its version are read under the same lock, so results
+        keyed on the version always describe that frame, even when another
+        thread refreshes the shared reader concurrently.
+        
+        Args:
+            snapshot (callable): Optional function called under the same
+                lock after the update, so state fed by subscribers (e.g. a
+                StatsRegistry snapshot) describes exactly the returned frame
+        
+        Returns:
+            tuple: (df, data_version, snapshot) current preprocessed data
+                (None if empty), its data_version and the result of
+                snapshot() (None if not given)
+        """
+        with self._lock:
+            size = os.path.getsize(self.file_path)
+            
+            if self.df is None or size < self._offset or not self._last_record_matches():
+                self._full_reload()
+            elif size > self._offset:
+                self._read_appended()
+            else:
+                self.last_appended = self.df.iloc[:0]
+            
+            return self.df, self.data_version, snapshot() if snapshot is not None else None
+    
+    @property
+    def data_version(self):
+        """
+        Fingerprint of the data currently held, for keying derived results.
+        
+        Returns:
+            tuple: (absolute path, version, byte offset)
+        """
+        return (os.path.abspath(self.file_path), self.version, self._offset)
+    
+    def _last_record_matches(self):
+        """Check that the remembered last record still ends at the offset."""
+        if not self._last_record:
+            return True
+        start = self._offset - len(self._last_record)
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            return f.read(len(self._last_record)) == self._last_record
+    
+    def _remember_position(self, offset):
+        """Store the offset and the complete line that ends there."""
+        start = max(0, offset - self._TAIL_WINDOW)
+        with open(self.file_path, 'rb') as f:
+            f.seek(start)
+            window = f.read(offset - start)
+        
+        line_start = window.rfind(b'\n', 0, len(window) - 1) + 1
+        self._offset = offset
+        self._last_record = window[line_start:]
+    
+    def _full_reload(self):
+        """Load the whole file and reset the tail position."""
+        with open(self.file_path, 'rb') as f:
+            data = f.read()
+        
+        # Only complete lines are consumed; a partially written last
+        # line is picked up by the next refresh once it is finished
+        offset = data.rfind(b'\n') + 1
+        header_end = data.find(b'\n') + 1
+        self._columns = data[:header_end].decode('utf-8').strip().split(',')
+        
+        if offset == len(data):
+            df, _ = _read_consumption_csv(
+                self.file_path, self.consumption_col, self.use_cache
+            )
+            # The loader reads the file again; only trust it if the file
+            # was not appended to in between
+            if os.path.getsize(self.file_path) != offset:
+                df = pd.read_csv(io.BytesIO(data), parse_dates=['date'])
+        else:
+            df = pd.read_csv(io.BytesIO(data[:offset]), parse_dates=['date'])
+        
+        self.df = preprocess_data(df, copy=False)
+        self._block_index = build_block_index(self.df)
+        self.last_appended = self.df
+        self.version += 1
+        self._remember_position(offset)
+        self._notify(self.df, True)
+    
+    def _read_appended(self):
+        """Parse the rows appended since the last refresh and merge them."""
+        with open(self.file_path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        
+        complete = data.rfind(b'\n') + 1
+        if complete == 0:
+            self.last_appended = self.df.iloc[:0]
+            return
+        
+        new_rows = pd.read_csv(
+            io.BytesIO(data[:complete]), header=None, names=self._columns
+        )
+        new_rows = preprocess_data(new_rows, copy=False)
+        
+        if new_rows is not None:
+            self.df, self._block_index = _merge_sorted(self.df, new_rows, self._block_index)
+            self.version += 1
+            self._notify(new_rows, False)
+        
+        self.last_appended = new_rows if new_rows is not None else self.df.iloc[:0]
+        self._remember_position(self._offset + complete)
+
+
+def _merge_sorted(df, new_rows, block_index=None):
+    """
+    Merge new rows into a frame sorted by ``hostel_block, date``.
+    Insert positions are found by binary search within each block's row
+    range, so the existing rows are never re-sorted, and every column is
+    gathered into the merged frame with a single copy.
+    
+    Args:
+        df (pandas.DataFrame): Existing sorted frame
+        new_rows (pandas.DataFrame): New rows, also sorted
+        block_index (dict): Partition index of ``df`` from
+            build_block_index (built here if not given)
+        
+    Returns:
+        tuple: (merged frame sorted by ``hostel_block, date``, its
+            partition index)
+    """
+    if df is None or len(df) == 0:
+        merged = new_rows.reset_index(drop=True)
+        return merged, build_block_index(merged)
+    if block_index is None:
+        block_index = build_block_index(df)
+    
+    sort_key = None
+    if isinstance(df['hostel_block'].dtype, pd.CategoricalDtype):
+        categories = df['hostel_block'].cat.categories
+        missing = set(new_rows['hostel_block']) - set(categories)
+        if missing:
+            categories = sorted(set(categories) | missing)
+            df = df.assign(hostel_block=df['hostel_block'].cat.set_categories(categories))
+        new_rows = new_rows.assign(
+            hostel_block=new_rows['hostel_block'].astype(df['hostel_block'].dtype)
+        )
+        # Categorical blocks sort by category position
+        sort_key = df['hostel_block'].cat.categories.get_loc
+    
+    # Blocks in row order, which is sort order, for placing new blocks
+    labels = list(block_index)
+    keys = [sort_key(label) for label in labels] if sort_key else labels
+    
+    dates = df['date'].to_numpy()
+    new_dates = new_rows['date'].to_numpy()
+    new_blocks = new_rows['hostel_block'].to_numpy()
+    positions = np.empty(len(new_rows), dtype=np.intp)
+    added = {}
+    
+    for block in pd.unique(new_blocks):
+        rows = np.flatnonzero(new_blocks == block)
+        if block in block_index:
+            start, stop = block_index[block]
+        else:
+            following = bisect.bisect_left(keys, sort_key(block) if sort_key else block)
+            start = stop = block_index[labels[following]][0] if following < len(labels) else len(df)
+        positions[rows] = start + np.searchsorted(
+            dates[start:stop], new_dates[rows], side='right'
+        )
+        added[block] = len(rows)
+    
+    # np.insert is stable for equal positions, so new rows landing in the
+    # same gap keep their own (already sorted) order
+    take = None
+    columns = {}
+    for name in df.columns:
+        old, new = df[name], new_rows[name]
+        if isinstance(old.dtype, np.dtype) and isinstance(new.dtype, np.dtype):
+            dtype = np.result_type(old.dtype, new.dtype)
+            columns[name] = np.insert(
+                old.to_numpy().astype(dtype, copy=False), positions, new.to_numpy(dtype=dtype)
+            )
+        elif isinstance(old.dtype, pd.CategoricalDtype) and new.dtype == old.dtype:
+            codes = np.insert(old.cat.codes.to_numpy(), positions, new.cat.codes.to_numpy())
+            columns[name] = pd.Categorical.from_codes(codes, dtype=old.dtype)
+        else:
+            # Extension arrays (e.g. Arrow strings) concatenate without
+            # copying their buffers; the take is the one copy
+            if take is None:
+                take = np.insert(
+                    np.arange(len(df)), positions, np.arange(len(df), len(df) + len(new_rows))
+                )
+            columns[name] = pd.concat([old, new], ignore_index=True).take(take).array
+    merged = pd.DataFrame(columns, copy=False)
+    
+    # Shift every block's row range by the rows inserted before it
+    labels = sorted(set(labels) | set(added), key=sort_key)
+    merged_index = {}
+    start = 0
+    for label in labels:
+        old_start, old_stop = block_index.get(label, (0, 0))
+        stop = start + old_stop - old_start + added.get(label, 0)
+        merged_index[label] = (start, stop)
+        start = stop
+    return merged, merged_index
+
+
 def get_latest_data(df, n=10):
     """
     Get the latest n records from the dataframe.
-    Simulates real-time data monitoring.
+    Simulates real-time data monitoring. When given an
+    IncrementalCSVReader, newly appended meter rows are read first.
     
     Args:
-        df (pandas.DataFrame): Input dataframe
+        df (pandas.DataFrame or IncrementalCSVReader): Input data
         n (int): Number of latest records to retrieve
         
     Returns:
         pandas.DataFrame: Latest n records
     """
+    if isinstance(df, IncrementalCSVReader):
+        df, _, _ = df.refresh()
+    
     if df is None or len(df) == 0:
         return None
     return df.tail(n)
@@ -1,18 +1,41 @@
 """
 Data Preprocessing Module
 This module handles data cleaning, transformation, and preparation.
+
+Helpers that return a modified frame accept ``copy``. With the default
+``copy=True`` the result is an independent deep copy. With
+``copy=False`` the result is a shallow copy that shares the unchanged
+columns with the input and only holds new or replaced columns of its
+own; the input frame is never written to, so stages can be chained
+without duplicating the dataset at every step.
 """
 
 import pandas as pd
 import numpy as np
 
 
-def preprocess_data(df):
+def _is_sorted_by_block_and_date(df):
+    """Check whether rows are already ordered by hostel_block, then date."""
+    blocks = df['hostel_block']
+    if df['date'].isna().any() or not blocks.is_monotonic_increasing:
+        return False
+    
+    same_block = blocks.eq(blocks.shift()).to_numpy(dtype=bool, na_value=False)[1:]
+    date_steps = np.diff(df['date'].to_numpy())
+    return bool((date_steps[same_block] >= np.timedelta64(0)).all())
+
+
+def preprocess_data(df, copy=True):
     """
     Preprocess the data by parsing dates, sorting, and cleaning.
+    Steps that would not change anything (input already sorted, no
+    duplicates, no missing values) are skipped instead of producing
+    another full copy.
     
     Args:
         df (pandas.DataFrame): Raw dataframe
+        copy (bool): Return an independent deep copy; False shares
+            unchanged columns with the input
         
     Returns:
         pandas.DataFrame: Processed dataframe
@@ -20,41 +43,179 @@ def preprocess_data(df):
     if df is None or len(df) == 0:
         return None
     
-    # Create a copy to avoid modifying original
-    df_clean = df.copy()
+    # Work on a shallow copy; the original is never written to
+    df_clean = df.copy(deep=False)
     
-    # Parse date column
-    df_clean['date'] = pd.to_datetime(df_clean['date'])
+    # Parse date column (loaders may already deliver parsed dates)
+    if not pd.api.types.is_datetime64_any_dtype(df_clean['date']):
+        df_clean['date'] = pd.to_datetime(df_clean['date'])
     
-    # Sort by date and hostel block
-    df_clean = df_clean.sort_values(['hostel_block', 'date']).reset_index(drop=True)
+    # Sort by date and hostel block; sorting already yields new data, so a
+    # deep copy is only needed when the input was sorted to begin with
+    if not _is_sorted_by_block_and_date(df_clean):
+        df_clean = df_clean.sort_values(['hostel_block', 'date'])
+    elif copy:
+        df_clean = df_clean.copy()
+    df_clean.index = pd.RangeIndex(len(df_clean))
     
     # Remove duplicates if any
-    df_clean = df_clean.drop_duplicates()
+    duplicated = df_clean.duplicated()
+    if duplicated.any():
+        df_clean = df_clean[~duplicated]
     
     # Handle missing values (if any)
-    df_clean = df_clean.dropna()
+    missing = df_clean.isna().any(axis=1)
+    if missing.any():
+        df_clean = df_clean[~missing]
     
     return df_clean
 
 
-def filter_by_block(df, block):
+def build_block_index(df):
+    """
+    Build a partition index mapping each hostel block to its row range.
+    The frame must be sorted by hostel_block, as returned by
+    preprocess_data, so every block occupies one contiguous range.
+    
+    Args:
+        df (pandas.DataFrame): Preprocessed dataframe
+        
+    Returns:
+        dict: Block identifier -> (start, stop) positional row range
+    """
+    if df is None:
+        return None
+    if len(df) == 0:
+        return {}
+    
+    # A block starts wherever the label differs from the previous row;
+    # comparing against a shifted column stays in the column's native
+    # (Arrow / categorical) representation instead of building Python strings
+    column = df['hostel_block']
+    changes = column.ne(column.shift()).to_numpy(dtype=bool, na_value=True)
+    
+    starts = np.flatnonzero(changes)
+    stops = np.append(starts[1:], len(df))
+    
+    labels = column.iloc[starts].tolist()
+    index = {label: (int(start), int(stop))
+             for label, start, stop in zip(labels, starts, stops)}
+    
+    if len(index) != len(starts):
+        raise ValueError("Dataframe must be sorted by hostel_block to build a block index")
+    
+    return index
+
+
+def get_block_rows(df, block_index, block):
+    """
+    Look up the rows of one block through a partition index.
+    
+    Args:
+        df (pandas.DataFrame): Dataframe the index was built from
+        block_index (dict): Index returned by build_block_index
+        block (str): Hostel block identifier
+        
+    Returns:
+        pandas.DataFrame: Zero-copy positional slice of the block's rows
+    """
+    start, stop = block_index.get(block, (0, 0))
+    return df.iloc[start:stop]
+
+
+def filter_by_block(df, block, block_index=None):
     """
     Filter data for a specific hostel block.
     
     Args:
         df (pandas.DataFrame): Input dataframe
         block (str): Hostel block identifier (e.g., 'A', 'B')
+        block_index (dict): Optional partition index from build_block_index;
+            when given, a zero-copy slice is returned instead of a copy
         
     Returns:
         pandas.DataFrame: Filtered dataframe
     """
     if df is None:
         return None
+    if block_index is not None:
+        return get_block_rows(df, block_index, block)
     return df[df['hostel_block'] == block].copy()
 
 
-def filter_by_date_range(df, start_date=None, end_date=None):
+def _window_row_ranges(df, block_index, windows):
+    """
+    Find the row ranges of several date windows by binary search.
+    Dates are sorted within every block partition, so each window bound
+    is located with one searchsorted call per block.
+    
+    Args:
+        df (pandas.DataFrame): Preprocessed dataframe
+        block_index (dict): Partition index from build_block_index
+        windows (list): (start_date, end_date) pairs; None means unbounded
+        
+    Returns:
+        list: For each window, a list of (start, stop) row ranges
+    """
+    dates = df['date'].to_numpy()
+    lows = np.array([
+        pd.Timestamp(start).to_datetime64() if start else np.datetime64('NaT')
+        for start, _ in windows
+    ]).astype(dates.dtype)
+    highs = np.array([
+        pd.Timestamp(end).to_datetime64() if end else np.datetime64('NaT')
+        for _, end in windows
+    ]).astype(dates.dtype)
+    no_low = np.isnat(lows)
+    no_high = np.isnat(highs)
+    
+    ranges = [[] for _ in windows]
+    for start, stop in block_index.values():
+        block_dates = dates[start:stop]
+        lo = np.where(no_low, 0, np.searchsorted(block_dates, lows, side='left'))
+        hi = np.where(no_high, stop - start,
+                      np.searchsorted(block_dates, highs, side='right'))
+        for i in np.flatnonzero(hi > lo):
+            ranges[i].append((start + lo[i], start + hi[i]))
+    
+    return ranges
+
+
+def _rows_from_ranges(df, ranges):
+    """Gather row ranges; a single range is returned as a zero-copy slice."""
+    if not ranges:
+        return df.iloc[:0]
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+        return df.iloc[start:stop]
+    positions = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+    return df.take(positions)
+
+
+def filter_by_date_windows(df, windows, block_index):
+    """
+    Filter data by several date ranges in one call.
+    Useful for period comparisons such as this week vs. last week.
+    
+    Args:
+        df (pandas.DataFrame): Preprocessed dataframe
+        windows (list): (start_date, end_date) pairs in 'YYYY-MM-DD' format;
+            either bound may be None
+        block_index (dict): Partition index from build_block_index
+        
+    Returns:
+        list: One filtered dataframe per window
+    """
+    if df is None:
+        return None
+    
+    return [
+        _rows_from_ranges(df, ranges)
+        for ranges in _window_row_ranges(df, block_index, windows)
+    ]
+
+
+def filter_by_date_range(df, start_date=None, end_date=None, block_index=None):
     """
     Filter data by date range.
     
@@ -62,6 +223,9 @@ def filter_by_date_range(df, start_date=None, end_date=None):
         df (pandas.DataFrame): Input dataframe
         start_date (str): Start date in 'YYYY-MM-DD' format
         end_date (str): End date in 'YYYY-MM-DD' format
+        block_index (dict): Optional partition index from build_block_index;
+            when given, bounds are found by binary search and no full copy
+            is made
         
     Returns:
         pandas.DataFrame: Filtered dataframe
@@ -69,23 +233,32 @@ def filter_by_date_range(df, start_date=None, end_date=None):
     if df is None:
         return None
     
-    df_filtered = df.copy()
+    if block_index is not None:
+        return filter_by_date_windows(df, [(start_date, end_date)], block_index)[0]
+    
+    if not start_date and not end_date:
+        return df.copy()
+    
+    # Combine both bounds into one mask so only one filtered copy is made
+    mask = np.ones(len(df), dtype=bool)
     
     if start_date:
-        df_filtered = df_filtered[df_filtered['date'] >= pd.to_datetime(start_date)]
+        mask &= (df['date'] >= pd.to_datetime(start_date)).to_numpy()
     
     if end_date:
-        df_filtered = df_filtered[df_filtered['date'] <= pd.to_datetime(end_date)]
+        mask &= (df['date'] <= pd.to_datetime(end_date)).to_numpy()
     
-    return df_filtered
+    return df[mask]
 
 
-def add_time_features(df):
+def add_time_features(df, copy=True):
     """
     Add time-based features for better analysis.
     
     Args:
         df (pandas.DataFrame): Input dataframe with 'date' column
+        copy (bool): Return an independent deep copy; False only adds
+            the new columns on a shallow copy
         
     Returns:
         pandas.DataFrame: Dataframe with additional time features
@@ -93,7 +266,7 @@ def add_time_features(df):
     if df is None:
         return None
     
-    df_enhanced = df.copy()
+    df_enhanced = df.copy(deep=copy)
     
     # Extract time features
     df_enhanced['day_of_week'] = df_enhanced['date'].dt.day_name()
@@ -104,13 +277,15 @@ def add_time_features(df):
     return df_enhanced
 
 
-def normalize_consumption_column(df, consumption_col):
+def normalize_consumption_column(df, consumption_col, copy=True):
     """
     Normalize consumption values for better comparison.
     
     Args:
         df (pandas.DataFrame): Input dataframe
         consumption_col (str): Name of consumption column
+        copy (bool): Return an independent deep copy; False only adds
+            the normalized column on a shallow copy
         
     Returns:
         pandas.DataFrame: Dataframe with normalized values
@@ -118,7 +293,7 @@ def normalize_consumption_column(df, consumption_col):
     if df is None or consumption_col not in df.columns:
         return None
     
-    df_normalized = df.copy()
+    df_normalized = df.copy(deep=copy)
     
     # Min-max normalization
     min_val = df_normalized[consumption_col].min()
@@ -0,0 +1,208 @@
+"""
+Model Registry Module
+This module caches fitted prediction models so unchanged data is never
+re-trained.
+
+Models are keyed on (resource, hostel block, fingerprint of the training
+data). Recently used models are kept in a bounded in-memory LRU; the
+latest model of every block is also pickled to a cache directory, so a
+restarted process reuses it as long as the block's data has not changed.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from atomic_write import atomic_write
+from prediction import train_prediction_model
+
+
+# Default number of models kept in memory
+DEFAULT_MAX_ENTRIES = 256
+
+
+def data_fingerprint(X, y):
+    """
+    Hash training data, so any changed, added or removed reading gives a
+    different key.
+    
+    Args:
+        X (numpy.array): Feature matrix
+        y (numpy.array): Target values
+    
+    Returns:
+        str: Hex digest of the data, its shapes and dtypes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Two-tier cache of (model, metrics) pairs returned by
+    prediction.train_prediction_model. Safe to share between threads.
+    
+    Attributes:
+        max_entries (int): Models kept in the in-memory LRU
+        cache_dir (str): Directory of the on-disk tier (None: memory only)
+    """
+    
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, cache_dir=None):
+        """
+        Args:
+            max_entries (int): Size of the in-memory LRU
+            cache_dir (str): Optional directory for the on-disk tier,
+                created if missing
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+    
+    def _disk_path(self, resource, block):
+        """Path of a block's model in the on-disk tier."""
+        name = hashlib.blake2b(f"{resource}|{block}".encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+    
+    def _read_disk(self, resource, block, fingerprint):
+        """
+        Read a block's stored model if it was trained on the same data.
+        
+        Returns:
+            tuple: (model, metrics), or None on a miss
+        """
+        if self.cache_dir is None:
+            return None
+        
+        path = self._disk_path(resource, block)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                stored = pickle.load(f)
+            if stored['fingerprint'] != fingerprint:
+                return None
+            return stored['model'], stored['metrics']
+        except Exception:
+            # A corrupt or unreadable file is treated as a miss
+            return None
+    
+    def _write_disk(self, resource, block, fingerprint, model, metrics):
+        """
+        Store a block's model, replacing the one of older data.
+        The file is written to a temporary name and moved into place so
+        concurrent readers never see a partially written model.
+        """
+        if self.cache_dir is None:
+            return
+        
+        path = self._disk_path(resource, block)
+        try:
+            with atomic_write(path) as f:
+                pickle.dump({'fingerprint': fingerprint, 'model': model, 'metrics': metrics}, f)
+        except OSError as e:
+            # Read-only cache directories still work, just without the disk tier
+            print(f"⚠️ Could not store model for {resource} block {block}: {e}")
+    
+    def get(self, resource, block, fingerprint):
+        """
+        Look a model up in memory, then on disk.
+        
+        Args:
+            resource (str): Resource name (e.g. 'Electricity')
+            block (str): Hostel block (None for all blocks)
+            fingerprint (str): data_fingerprint of the training data
+        
+        Returns:
+            tuple: (model, metrics), or None on a miss
+        """
+        key = (resource, block, fingerprint)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return self._models[key]
+        
+        entry = self._read_disk(resource, block, fingerprint)
+        with self._lock:
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._remember(key, entry)
+        return entry
+    
+    def put(self, resource, block, fingerprint, model, metrics):
+        """Store a fitted model in both tiers."""
+        with self._lock:
+            self._remember((resource, block, fingerprint), (model, metrics))
+        self._write_disk(resource, block, fingerprint, model, metrics)
+    
+    def _remember(self, key, entry):
+        """Insert into the LRU, evicting the least recently used model."""
+        self._models[key] = entry
+        self._models.move_to_end(key)
+        while len(self._models) > self.max_entries:
+            self._models.popitem(last=False)
+    
+    def train(self, resource, block, X, y):
+        """
+        Drop-in for train_prediction_model that fits only on a miss.
+        
+        Args:
+            resource (str): Resource name
+            block (str): Hostel block (None for all blocks)
+            X (numpy.array): Feature matrix
+            y (numpy.array): Target values
+        
+        Returns:
+            tuple: (model, metrics) as returned by train_prediction_model
+        """
+        if X is None or y is None or len(X) == 0:
+            return None, None
+        
+        fingerprint = data_fingerprint(X, y)
+        entry = self.get(resource, block, fingerprint)
+        if entry is not None:
+            return entry
+        
+        model, metrics = train_prediction_model(X, y)
+        if model is not None:
+            self.put(resource, block, fingerprint, model, metrics)
+        return model, metrics
+    
+    def stats(self):
+        """
+        Cache counters since creation.
+        
+        Returns:
+            dict: memory_hits, disk_hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            counters['entries'] = len(self._models)
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        hits = counters['memory_hits'] + counters['disk_hits']
+        counters['hit_rate'] = hits / lookups if lookups else 0.0
+        return counters
+    
+    def clear(self):
+        """Drop the in-memory models (the on-disk tier is kept)."""
+        with self._lock:
+            self._models.clear()
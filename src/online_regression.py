@@ -0,0 +1,230 @@
+"""
+Online Regression Module
+This module fits the prediction model incrementally as readings arrive.
+
+A regressor keeps the sufficient statistics of a simple linear regression
+(weight, means and centred co-moments of day index and consumption).
+Each reading is absorbed in O(1) and batches are merged exactly, so the
+coefficients always equal a full refit on all readings seen. This holds
+whatever the length of the history. An optional forgetting factor
+discounts older readings geometrically (e.g. past semesters).
+"""
+
+import threading
+
+import numpy as np
+
+
+class OnlineLinearRegression:
+    """
+    Incremental least squares fit of consumption against day index.
+    Drop-in for the LinearRegression model consumed by
+    prediction.predict_next_day and prediction.predict_multiple_days.
+    
+    Attributes:
+        forgetting (float): Factor every older reading's weight is
+            multiplied by when a new reading arrives (1.0: no forgetting)
+        count (int): Number of readings seen
+        weight (float): Total (discounted) weight of the readings
+    """
+    
+    __slots__ = ('forgetting', 'count', 'weight', 'x_mean', 'y_mean', 'sxx', 'sxy')
+    
+    def __init__(self, forgetting=1.0):
+        """
+        Args:
+            forgetting (float): Forgetting factor in (0, 1]
+        """
+        if not 0 < forgetting <= 1:
+            raise ValueError(f"forgetting must be in (0, 1], got {forgetting}")
+        
+        self.forgetting = forgetting
+        self.count = 0
+        self.weight = 0.0
+        self.x_mean = 0.0
+        self.y_mean = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+    
+    def update(self, x, y):
+        """
+        Absorb one reading (weighted Welford update).
+        
+        Args:
+            x (float): Day index
+            y (float): Consumption value; NaN is ignored
+        
+        Returns:
+            OnlineLinearRegression: self
+        """
+        if y != y:  # NaN
+            return self
+        
+        self.count += 1
+        self.weight = self.forgetting * self.weight + 1.0
+        dx = x - self.x_mean
+        self.x_mean += dx / self.weight
+        self.y_mean += (y - self.y_mean) / self.weight
+        self.sxx = self.forgetting * self.sxx + dx * (x - self.x_mean)
+        self.sxy = self.forgetting * self.sxy + dx * (y - self.y_mean)
+        return self
+    
+    def update_many(self, X, y):
+        """
+        Absorb a batch of readings, in order, with one vectorized pass.
+        
+        Args:
+            X (array-like): Day indices, shape (n,) or (n, 1)
+            y (array-like): Consumption values; NaNs are ignored
+        
+        Returns:
+            OnlineLinearRegression: self
+        """
+        x = np.asarray(X, dtype=float).reshape(-1)
+        y = np.asarray(y, dtype=float)
+        keep = ~np.isnan(y)
+        x, y = x[keep], y[keep]
+        if len(x) == 0:
+            return self
+        
+        # Newest reading weighs 1, the one before it forgetting, ...
+        weights = self.forgetting ** np.arange(len(x) - 1, -1, -1, dtype=float)
+        batch = OnlineLinearRegression(self.forgetting)
+        batch.count = len(x)
+        batch.weight = weights.sum()
+        batch.x_mean = np.dot(weights, x) / batch.weight
+        batch.y_mean = np.dot(weights, y) / batch.weight
+        dx = x - batch.x_mean
+        batch.sxx = np.dot(weights * dx, dx)
+        batch.sxy = np.dot(weights * dx, y - batch.y_mean)
+        
+        # Everything seen so far is older than the whole batch
+        decay = self.forgetting ** len(x)
+        self.weight *= decay
+        self.sxx *= decay
+        self.sxy *= decay
+        return self.merge(batch)
+    
+    def merge(self, other):
+        """
+        Merge the statistics of readings that came after this one's.
+        Weights are taken as they are; update_many decays them first.
+        
+        Args:
+            other (OnlineLinearRegression): Regressor of a disjoint set of readings
+        
+        Returns:
+            OnlineLinearRegression: self
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0 or self.weight == 0:
+            for name in self.__slots__[1:]:
+                setattr(self, name, getattr(other, name))
+            return self
+        
+        weight = self.weight + other.weight
+        dx = other.x_mean - self.x_mean
+        dy = other.y_mean - self.y_mean
+        share = self.weight * other.weight / weight
+        self.sxx += other.sxx + dx * dx * share
+        self.sxy += other.sxy + dx * dy * share
+        self.x_mean += dx * other.weight / weight
+        self.y_mean += dy * other.weight / weight
+        self.weight = weight
+        self.count += other.count
+        return self
+    
+    def fit(self, X, y):
+        """
+        Fit on a full history, discarding previous readings (sklearn-style).
+        
+        Returns:
+            OnlineLinearRegression: self
+        """
+        self.count = 0
+        self.weight = 0.0
+        self.x_mean = self.y_mean = self.sxx = self.sxy = 0.0
+        return self.update_many(X, y)
+    
+    @property
+    def slope(self):
+        """Fitted slope (0 until two distinct day indices were seen)."""
+        return self.sxy / self.sxx if self.sxx > 0 else 0.0
+    
+    @property
+    def coef_(self):
+        """Coefficients, as in sklearn's LinearRegression."""
+        return np.array([self.slope])
+    
+    @property
+    def intercept_(self):
+        """Intercept, as in sklearn's LinearRegression."""
+        return self.y_mean - self.slope * self.x_mean
+    
+    def predict(self, X):
+        """
+        Predict consumption for day indices.
+        
+        Args:
+            X (array-like): Day indices, shape (n, 1)
+        
+        Returns:
+            numpy.ndarray: Predicted values
+        """
+        x = np.asarray(X, dtype=float).reshape(-1)
+        return self.intercept_ + self.slope * x
+
+
+class BlockRegressors:
+    """
+    Online regressors kept per hostel block, fed with new rows as they
+    are appended. Day indices continue from each block's reading count,
+    as in prediction.prepare_data_for_prediction. Safe to share between
+    threads.
+    """
+    
+    def __init__(self, forgetting=1.0):
+        """
+        Args:
+            forgetting (float): Forgetting factor of every block's regressor
+        """
+        self.forgetting = forgetting
+        self._models = {}
+        self._lock = threading.Lock()
+    
+    def update_frame(self, df, consumption_col, reset=False):
+        """
+        Absorb new rows (sorted by date within each block).
+        
+        Args:
+            df (pandas.DataFrame): New rows with hostel_block column
+            consumption_col (str): Name of consumption column
+            reset (bool): Drop all regressors first (used when the source
+                was reloaded from scratch)
+        """
+        with self._lock:
+            if reset:
+                self._models = {}
+            if df is None or len(df) == 0:
+                return
+            for block, values in df.groupby('hostel_block', observed=True, sort=False)[consumption_col]:
+                values = values.dropna()
+                model = self._models.setdefault(block, OnlineLinearRegression(self.forgetting))
+                days = np.arange(model.count + 1, model.count + len(values) + 1)
+                model.update_many(days, values.to_numpy())
+    
+    def get(self, block):
+        """
+        Regressor of one block.
+        
+        Returns:
+            tuple: (model, last_day_index) for predict_next_day and
+                predict_multiple_days, or (None, 0) for an unknown block
+        """
+        with self._lock:
+            model = self._models.get(block)
+            if model is None:
+                return None, 0
+            copy = OnlineLinearRegression(model.forgetting).merge(model)
+        return copy, copy.count
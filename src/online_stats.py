@@ -0,0 +1,241 @@
+"""
+Online Statistics Module
+This module keeps streaming (Welford-style) statistics for live meter feeds.
+
+Accumulators hold count, sum, mean, variance, minimum and maximum. They
+absorb a reading in O(1), absorb a batch with one vectorized pass and
+merge exactly with other accumulators (Chan et al.), so statistics over
+years of history never need a rescan of the full frame.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """
+    Mergeable streaming statistics of one series of readings.
+    
+    Attributes:
+        count (int): Number of readings seen
+        mean (float): Running mean
+        m2 (float): Sum of squared deviations from the mean
+        total: Running sum
+        minimum: Smallest reading (None before the first reading)
+        maximum: Largest reading (None before the first reading)
+    """
+    
+    __slots__ = ('count', 'mean', 'm2', 'total', 'minimum', 'maximum')
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+    
+    def update(self, value):
+        """
+        Add one reading (Welford's update).
+        
+        Args:
+            value (float): New reading; NaN is ignored
+        
+        Returns:
+            RunningStats: self
+        """
+        if value != value:  # NaN
+            return self
+        
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        return self
+    
+    def update_many(self, values):
+        """
+        Add a batch of readings with one vectorized pass.
+        
+        Args:
+            values (array-like): New readings; NaNs are ignored
+        
+        Returns:
+            RunningStats: self
+        """
+        values = np.asarray(values)
+        if values.dtype.kind == 'f':
+            values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        
+        batch = RunningStats()
+        batch.count = len(values)
+        batch.total = values.sum()
+        batch.mean = float(batch.total) / batch.count
+        deviations = values - batch.mean
+        batch.m2 = float(np.dot(deviations, deviations))
+        batch.minimum = values.min()
+        batch.maximum = values.max()
+        return self.merge(batch)
+    
+    def merge(self, other):
+        """
+        Merge another accumulator into this one (Chan's parallel formula).
+        
+        Args:
+            other (RunningStats): Accumulator of a disjoint set of readings
+        
+        Returns:
+            RunningStats: self
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+        
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+    
+    def copy(self):
+        """Return an independent copy of the accumulator."""
+        return RunningStats().merge(self)
+    
+    @property
+    def variance(self):
+        """Sample variance (ddof=1, like pandas)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+    
+    @property
+    def std_dev(self):
+        """Sample standard deviation (ddof=1, like pandas)."""
+        return np.sqrt(self.variance)
+    
+    def to_dict(self):
+        """
+        Export in the format of analysis.calculate_statistics.
+        The median cannot be maintained online and is reported as None.
+        
+        Returns:
+            dict: average, maximum, minimum, median, std_dev, total, count
+        """
+        return {
+            'average': self.mean if self.count else np.nan,
+            'maximum': self.maximum,
+            'minimum': self.minimum,
+            'median': None,
+            'std_dev': self.std_dev,
+            'total': self.total,
+            'count': self.count
+        }
+
+
+class StatsRegistry:
+    """
+    Running statistics kept per resource and hostel block.
+    Safe to share between threads (e.g. Streamlit sessions).
+    """
+    
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def update(self, resource, block, value):
+        """Add one reading of a block in O(1)."""
+        with self._lock:
+            self._stats.setdefault(resource, {}).setdefault(block, RunningStats()).update(value)
+    
+    def update_frame(self, resource, df, consumption_col, reset=False):
+        """
+        Add a batch of readings, split by hostel block.
+        
+        Args:
+            resource (str): Resource name (e.g. 'Electricity')
+            df (pandas.DataFrame): New rows with hostel_block column
+            consumption_col (str): Name of consumption column
+            reset (bool): Drop the resource's accumulators first (used
+                when the source was reloaded from scratch)
+        """
+        batches = {}
+        if df is not None and len(df):
+            for block, values in df.groupby('hostel_block', observed=True, sort=False)[consumption_col]:
+                batches[block] = RunningStats().update_many(values.to_numpy())
+        
+        with self._lock:
+            if reset:
+                self._stats[resource] = {}
+            blocks = self._stats.setdefault(resource, {})
+            for block, batch in batches.items():
+                blocks.setdefault(block, RunningStats()).merge(batch)
+    
+    def get(self, resource, block=None):
+        """
+        Statistics of one block, or of all blocks of a resource merged.
+        
+        Args:
+            resource (str): Resource name
+            block (str): Hostel block, or None for all blocks
+        
+        Returns:
+            RunningStats: Copy of the accumulator (empty if unknown)
+        """
+        with self._lock:
+            blocks = self._stats.get(resource, {})
+            if block is not None:
+                return blocks.get(block, RunningStats()).copy()
+            merged = RunningStats()
+            for stats in blocks.values():
+                merged.merge(stats)
+            return merged
+    
+    def snapshot(self, resource=None):
+        """
+        Independent copy of the accumulators, e.g. taken under a reader's
+        lock so it matches the frame that refresh returned.
+        
+        Args:
+            resource (str): Copy only this resource (None for all)
+        
+        Returns:
+            StatsRegistry: Registry holding copies of the accumulators
+        """
+        copy = StatsRegistry()
+        with self._lock:
+            resources = [resource] if resource is not None else list(self._stats)
+            for name in resources:
+                copy._stats[name] = {
+                    block: stats.copy() for block, stats in self._stats.get(name, {}).items()
+                }
+        return copy
+    
+    def block_table(self, resource):
+        """
+        Per-block statistics of a resource as a DataFrame.
+        
+        Returns:
+            pandas.DataFrame: Indexed by hostel_block, one column per
+                statistic (without median); usable as block_stats in
+                analysis.compare_blocks
+        """
+        with self._lock:
+            rows = {block: stats.to_dict() for block, stats in self._stats.get(resource, {}).items()}
+        
+        table = pd.DataFrame.from_dict(rows, orient='index')
+        table = table.drop(columns='median', errors='ignore').sort_index()
+        table.index.name = 'hostel_block'
+        return table
@@ -0,0 +1,213 @@
+"""
+Parallel Aggregation Module
+This module builds the block comparison table from partial aggregates
+computed in a process pool.
+
+Every partition (a row range of a frame, or a byte range of a CSV file)
+is reduced to per-block partial aggregates: sum, count, min, max and sum
+of squares. Partials are merged by adding sums, counts and sums of
+squares and taking the min of minima and max of maxima, so the merged
+table does not depend on how the data was split. CSV partitions are read
+and parsed by the workers themselves; the whole history never has to
+fit in one process.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Partial aggregate columns and how each merges across partitions
+PARTIAL_AGGREGATES = {
+    'sum': 'sum',
+    'count': 'sum',
+    'min': 'min',
+    'max': 'max',
+    'sumsq': 'sum'
+}
+
+
+def partial_aggregates(blocks, values):
+    """
+    Reduce one partition to per-block partial aggregates.
+    
+    Args:
+        blocks (array-like): Hostel block of every reading
+        values (array-like): Consumption values (NaNs are not counted)
+    
+    Returns:
+        pandas.DataFrame: Indexed by hostel_block, with the
+            PARTIAL_AGGREGATES columns
+    """
+    values = pd.Series(values)
+    keys = np.asarray(blocks)
+    grouped = values.groupby(keys, sort=False)
+    partial = grouped.agg(['sum', 'count', 'min', 'max'])
+    partial['sumsq'] = (values.astype(float) ** 2).groupby(keys, sort=False).sum()
+    partial.index.name = 'hostel_block'
+    return partial
+
+
+def merge_partial_aggregates(partials):
+    """
+    Merge partial aggregates of disjoint partitions.
+    
+    Args:
+        partials (list): DataFrames returned by partial_aggregates
+    
+    Returns:
+        pandas.DataFrame: Per-block sum, count, min, max and sumsq plus the
+            derived mean and std (ddof=1), sorted by hostel_block
+    """
+    partials = [partial for partial in partials if len(partial)]
+    if not partials:
+        return None
+    
+    merged = pd.concat(partials).groupby(level='hostel_block', sort=True).agg(PARTIAL_AGGREGATES)
+    counts = merged['count']
+    merged['mean'] = merged['sum'] / counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (merged['sumsq'] - merged['sum'] ** 2 / counts) / (counts - 1)
+    merged['std'] = np.sqrt(variance.clip(lower=0).where(counts > 1))
+    return merged
+
+
+def _aggregate_arrays(codes, values):
+    """Worker: partial aggregates of one row range shipped as arrays."""
+    partial = partial_aggregates(codes, values)
+    return partial[partial.index >= 0]  # missing blocks are factorized to -1
+
+
+def _aggregate_csv_range(file_path, start, stop, columns, consumption_col):
+    """Worker: read, parse and reduce one byte range of a CSV file."""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    if not data.strip():
+        return partial_aggregates([], [])
+    
+    chunk = pd.read_csv(
+        io.BytesIO(data), header=None, names=columns,
+        usecols=['hostel_block', consumption_col], dtype={'hostel_block': str}
+    )
+    return partial_aggregates(chunk['hostel_block'].to_numpy(), chunk[consumption_col].to_numpy())
+
+
+def csv_byte_ranges(file_path, partitions):
+    """
+    Split a CSV file's body into line-aligned byte ranges.
+    
+    Args:
+        file_path (str): Path to the CSV file
+        partitions (int): Number of ranges wanted
+    
+    Returns:
+        tuple: (columns, ranges) header columns and a list of (start, stop)
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        body_start = f.tell()
+        columns = header.decode('utf-8').strip().split(',')
+        
+        bounds = [body_start]
+        step = max(1, (size - body_start) // partitions)
+        for i in range(1, partitions):
+            target = max(bounds[-1], body_start + i * step)
+            if target >= size:
+                break
+            f.seek(target)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+    
+    ranges = [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+    return columns, ranges
+
+
+def aggregate_blocks(source, consumption_col, workers=None, partitions=None):
+    """
+    Per-block aggregates of a frame or CSV file, computed in parallel.
+    
+    Args:
+        source: DataFrame with hostel_block column, or path to a meter CSV
+        consumption_col (str): Name of consumption column
+        workers (int): Worker processes (default: CPU count); 1 runs in
+            this process without a pool
+        partitions (int): Number of partitions (default: workers)
+    
+    Returns:
+        pandas.DataFrame: As returned by merge_partial_aggregates
+    """
+    workers = workers or os.cpu_count() or 1
+    partitions = partitions or workers
+    
+    labels = None
+    if isinstance(source, pd.DataFrame):
+        # Workers group small integer codes instead of block labels, which
+        # are also much cheaper to ship to them
+        codes, labels = pd.factorize(source['hostel_block'])
+        values = source[consumption_col].to_numpy()
+        bounds = np.linspace(0, len(source), partitions + 1).astype(int)
+        tasks = [
+            (_aggregate_arrays, codes[start:stop], values[start:stop])
+            for start, stop in zip(bounds, bounds[1:]) if stop > start
+        ]
+    else:
+        columns, ranges = csv_byte_ranges(source, partitions)
+        tasks = [
+            (_aggregate_csv_range, source, start, stop, columns, consumption_col)
+            for start, stop in ranges
+        ]
+    
+    if workers == 1:
+        partials = [task[0](*task[1:]) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(*task) for task in tasks]
+            partials = [future.result() for future in futures]
+    
+    if labels is not None:
+        for partial in partials:
+            partial.index = pd.Index(np.asarray(labels)[partial.index], name='hostel_block')
+    
+    return merge_partial_aggregates(partials)
+
+
+def compare_blocks_parallel(source, consumption_col, workers=None, partitions=None):
+    """
+    Compare consumption between hostel blocks using parallel partial
+    aggregates. Returns the same table as analysis.compare_blocks (for a
+    CSV file: compare_blocks of the file's rows as read by pandas).
+    
+    Args:
+        source: DataFrame with hostel_block column, or path to a meter CSV
+        consumption_col (str): Name of consumption column
+        workers (int): Worker processes (default: CPU count)
+        partitions (int): Number of partitions (default: workers)
+    
+    Returns:
+        pandas.DataFrame: Comparison summary
+    """
+    merged = aggregate_blocks(source, consumption_col, workers, partitions)
+    if merged is None:
+        return None
+    
+    comparison = pd.DataFrame({
+        'Average': merged['mean'],
+        'Maximum': merged['max'],
+        'Minimum': merged['min'],
+        'Total': merged['sum'],
+        'Count': merged['count']
+    })
+    
+    # Keep the block dtype of the frame (e.g. categorical), as groupby does
+    if isinstance(source, pd.DataFrame):
+        comparison.index = pd.Index(
+            comparison.index, dtype=source['hostel_block'].dtype, name='hostel_block'
+        )
+    
+    return comparison.round(2)
@@ -0,0 +1,97 @@
+"""
+Pipeline Module
+This module chains the preprocessing and analysis stages and reports the
+time and memory each stage needs.
+
+In copy-free mode (``copy=False``) every stage returns a shallow copy
+that shares unchanged columns with its input and only allocates the
+columns it adds, so the chain holds one copy of the dataset instead of
+one per stage. The per-stage report is meant for sizing containers.
+"""
+
+import time
+import tracemalloc
+
+import pandas as pd
+
+from data_preprocessing import preprocess_data, add_time_features, normalize_consumption_column
+from analysis import detect_anomalies
+
+
+def _pipeline_stages(consumption_col, threshold):
+    """Return the (name, function) stages of the standard pipeline."""
+    return [
+        ('preprocess_data', lambda df, copy: preprocess_data(df, copy=copy)),
+        ('add_time_features', lambda df, copy: add_time_features(df, copy=copy)),
+        ('normalize_consumption_column',
+         lambda df, copy: normalize_consumption_column(df, consumption_col, copy=copy)),
+        ('detect_anomalies',
+         lambda df, copy: detect_anomalies(df, consumption_col, threshold, copy=copy)),
+    ]
+
+
+def _frame_megabytes(df):
+    """Memory held by a frame's columns in MB (shared columns included)."""
+    if df is None:
+        return 0.0
+    return df.memory_usage(deep=True, index=True).sum() / 1e6
+
+
+def run_pipeline(df, consumption_col, threshold=2.0, copy=False, track_memory=True):
+    """
+    Run preprocessing, feature and anomaly stages on raw data.
+    
+    Args:
+        df (pandas.DataFrame): Raw dataframe as returned by the loaders
+        consumption_col (str): Name of consumption column
+        threshold (float): Anomaly threshold in standard deviations
+        copy (bool): Deep-copy at every stage (the classic behaviour);
+            False chains the stages without intermediate full copies
+        track_memory (bool): Measure peak allocations per stage with
+            tracemalloc (this slows the stages down, so take timings
+            from an untracked run)
+    
+    Returns:
+        tuple: (result, report) final dataframe and a per-stage report
+            with columns stage, seconds, peak_mb and frame_mb.
+            peak_mb is the peak traced (NumPy/Python) allocation during
+            the stage; frame_mb is the size of the stage's output.
+    """
+    if df is None or len(df) == 0:
+        return None, None
+    
+    rows = []
+    result = df
+    
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    
+    try:
+        for name, stage in _pipeline_stages(consumption_col, threshold):
+            if track_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            
+            start = time.perf_counter()
+            result = stage(result, copy)
+            elapsed = time.perf_counter() - start
+            
+            peak_mb = None
+            if track_memory:
+                peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 1e6
+            
+            rows.append({
+                'stage': name,
+                'seconds': elapsed,
+                'peak_mb': peak_mb,
+                'frame_mb': _frame_megabytes(result)
+            })
+            
+            if result is None:
+                break
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    
+    return result, pd.DataFrame(rows)
@@ -2,6 +2,11 @@
 Prediction Module
 This module uses machine learning to predict future consumption.
 Uses Linear Regression for next-day prediction.
+
+The model is univariate (consumption against day number), so the batched
+API fits every hostel block at once with closed-form least squares over
+NumPy arrays, reproducing the per-block sklearn results, train/test
+split included, without a Python loop per block.
 """
 
 import pandas as pd
@@ -9,6 +14,16 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from scipy import stats
+
+from data_preprocessing import build_block_index, filter_by_block
+
+
+# Length of the forecast reported by the prediction summaries
+FORECAST_DAYS = 7
+
+# Default confidence level of the prediction intervals
+FORECAST_CONFIDENCE = 0.95
 
 
 def prepare_data_for_prediction(df, consumption_col):
@@ -113,16 +128,14 @@ def predict_multiple_days(model, last_day_index, num_days=7):
     if model is None:
         return None
     
-    predictions = []
-    for i in range(1, num_days + 1):
-        future_day_index = last_day_index + i
-        pred = model.predict([[future_day_index]])
-        predictions.append(pred[0])
+    future_day_index = np.arange(last_day_index + 1, last_day_index + num_days + 1)
+    predictions = model.predict(future_day_index.reshape(-1, 1))
     
-    return predictions
+    return predictions.tolist()
 
 
-def get_prediction_summary(df, consumption_col, hostel_block=None):
+def get_prediction_summary(df, consumption_col, hostel_block=None, block_index=None,
+                           registry=None, resource=None):
     """
     Complete prediction pipeline: prepare data, train model, and predict.
     
@@ -130,6 +143,11 @@ def get_prediction_summary(df, consumption_col, hostel_block=None):
         df (pandas.DataFrame): Input dataframe
         consumption_col (str): Name of consumption column
         hostel_block (str): Optional filter for specific hostel block
+        block_index (dict): Optional partition index of df from
+            build_block_index, used to slice the block without scanning
+        registry (model_registry.ModelRegistry): Optional model cache; the
+            model is only trained if the block's data changed
+        resource (str): Resource name the registry keys models on
         
     Returns:
         dict: Prediction results and model metrics
@@ -139,26 +157,45 @@ def get_prediction_summary(df, consumption_col, hostel_block=None):
     
     # Filter by block if specified
     if hostel_block:
-        df = df[df['hostel_block'] == hostel_block].copy()
+        df = filter_by_block(df, hostel_block, block_index)
     
     # Prepare data
     X, y = prepare_data_for_prediction(df, consumption_col)
     
+    # Train model (or reuse the one fitted on the same data)
+    train = None
+    if registry is not None:
+        train = lambda X, y: registry.train(resource, hostel_block, X, y)
+    
+    return summarize_prediction(X, y, train)
+
+
+def summarize_prediction(X, y, train=None):
+    """
+    Train and forecast from prepared arrays; the DataFrame-free core of
+    get_prediction_summary.
+    
+    Args:
+        X (numpy.array): Day index feature matrix from prepare_data_for_prediction
+        y (numpy.array): Target values in date order
+        train (callable): Optional (X, y) -> (model, metrics) replacement
+            for train_prediction_model
+        
+    Returns:
+        dict: Prediction results and model metrics
+    """
     if X is None or len(X) == 0:
         return None
     
-    # Train model
-    model, metrics = train_prediction_model(X, y)
+    model, metrics = (train or train_prediction_model)(X, y)
     
     if model is None:
         return None
     
-    # Predict next day
+    # Predict next 7 days; the first one is the next-day prediction
     last_day_index = len(X)
-    next_day_pred = predict_next_day(model, last_day_index)
-    
-    # Predict next 7 days
-    week_predictions = predict_multiple_days(model, last_day_index, 7)
+    week_predictions = predict_multiple_days(model, last_day_index, FORECAST_DAYS)
+    next_day_pred = week_predictions[0]
     
     summary = {
         'model_metrics': metrics,
@@ -170,3 +207,259 @@ def get_prediction_summary(df, consumption_col, hostel_block=None):
     }
     
     return summary
+
+
+def _split_indices(n):
+    """
+    Train and test positions train_prediction_model uses for n samples.
+    
+    Args:
+        n (int): Number of samples
+        
+    Returns:
+        tuple: (train, test) position arrays
+    """
+    positions = np.arange(n)
+    if n > 5:
+        train, test = train_test_split(positions, test_size=0.2, random_state=42)
+        return train, test
+    return positions, positions
+
+
+def _block_series_bounds(df, block_index=None):
+    """Block labels and row ranges of a frame sorted by block and date."""
+    if block_index is None:
+        block_index = build_block_index(df)
+    labels = list(block_index)
+    bounds = np.array(list(block_index.values()), dtype=np.intp).reshape(-1, 2)
+    return labels, bounds[:, 0], bounds[:, 1]
+
+
+def block_series_layout(df, block_index=None):
+    """
+    Lay a frame out as one date-ordered series per hostel block.
+    
+    Args:
+        df (pandas.DataFrame): Input dataframe, normally sorted by
+            hostel_block and date as preprocess_data leaves it (other
+            orders are sorted)
+        block_index (dict): Optional partition index from build_block_index
+        
+    Returns:
+        tuple: (df, labels, starts, stops) the frame in block/date order,
+            block labels and the row range of every block
+    """
+    try:
+        labels, starts, stops = _block_series_bounds(df, block_index)
+        dates = df['date'].to_numpy()
+        steps = np.diff(dates)
+        steps[stops[stops < len(df)] - 1] = np.timedelta64(0)
+        if (steps < np.timedelta64(0)).any():
+            raise ValueError("Dates are not sorted within blocks")
+    except ValueError:
+        df = df.sort_values(['hostel_block', 'date'], kind='stable')
+        labels, starts, stops = _block_series_bounds(df)
+    return df, labels, starts, stops
+
+
+def fit_batched_models(df, consumption_col, block_index=None):
+    """
+    Fit the prediction model of every hostel block in one vectorized solve.
+    
+    Blocks with the same number of readings share the train/test split of
+    train_prediction_model, so each such group is one matrix of series:
+    slopes and intercepts come from the closed-form least squares
+    solution over all rows at once and the test metrics likewise.
+    
+    Args:
+        df (pandas.DataFrame): Input dataframe, sorted by hostel_block and
+            date as preprocess_data leaves it (other orders are sorted)
+        consumption_col (str): Name of consumption column
+        block_index (dict): Optional partition index from build_block_index
+        
+    Returns:
+        pandas.DataFrame: Indexed by hostel_block with slope, intercept,
+            n_days (last day index), last_actual_value, r2_score, mse,
+            rmse and mae columns, plus n_train, x_mean, sxx and residual_std
+            (training fit) for the prediction intervals
+    """
+    if df is None or len(df) == 0:
+        return None
+    
+    df, labels, starts, stops = block_series_layout(df, block_index)
+    values = df[consumption_col].to_numpy(dtype=float)
+    lengths = stops - starts
+    
+    columns = ['slope', 'intercept', 'r2_score', 'mse', 'rmse', 'mae',
+               'n_train', 'x_mean', 'sxx', 'residual_std']
+    results = {name: np.full(len(labels), np.nan) for name in columns}
+    
+    for n in np.unique(lengths[lengths > 0]):
+        rows = np.flatnonzero(lengths == n)
+        series = values[starts[rows, None] + np.arange(n)]
+        train, test = _split_indices(int(n))
+        
+        # Closed-form simple linear regression on the training days
+        x_train = train + 1.0
+        y_train = series[:, train]
+        x_mean = x_train.mean()
+        y_mean = y_train.mean(axis=1)
+        x_centered = x_train - x_mean
+        sxx = np.dot(x_centered, x_centered)
+        sxy = (y_train - y_mean[:, None]) @ x_centered
+        slope = sxy / sxx if sxx > 0 else np.zeros(len(rows))
+        intercept = y_mean - slope * x_mean
+        
+        # Residual standard error of the training fit (n - 2 degrees of freedom)
+        if len(train) > 2:
+            fit_residuals = y_train - (intercept[:, None] + slope[:, None] * x_train)
+            residual_std = np.sqrt(np.sum(fit_residuals ** 2, axis=1) / (len(train) - 2))
+        else:
+            residual_std = np.full(len(rows), np.nan)
+        
+        # Metrics on the test days
+        y_test = series[:, test]
+        residuals = y_test - (intercept[:, None] + slope[:, None] * (test + 1.0))
+        ss_res = np.sum(residuals ** 2, axis=1)
+        ss_tot = np.sum((y_test - y_test.mean(axis=1)[:, None]) ** 2, axis=1)
+        if len(test) < 2:
+            r2 = np.full(len(rows), np.nan)
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.where(ss_res == 0, 1.0, 0.0))
+        mse = ss_res / len(test)
+        
+        results['slope'][rows] = slope
+        results['intercept'][rows] = intercept
+        results['r2_score'][rows] = r2
+        results['mse'][rows] = mse
+        results['rmse'][rows] = np.sqrt(mse)
+        results['mae'][rows] = np.mean(np.abs(residuals), axis=1)
+        results['n_train'][rows] = len(train)
+        results['x_mean'][rows] = x_mean
+        results['sxx'][rows] = sxx
+        results['residual_std'][rows] = residual_std
+    
+    models = pd.DataFrame(results, index=pd.Index(labels, name='hostel_block'))
+    models.insert(2, 'n_days', lengths)
+    models.insert(3, 'last_actual_value', np.where(lengths > 0, values[np.maximum(stops - 1, 0)], np.nan))
+    return models[lengths > 0]
+
+
+def _horizon_matrix(models, horizons):
+    """
+    Days ahead to forecast per block as a (blocks, k) matrix.
+    
+    Args:
+        models (pandas.DataFrame): Result of fit_batched_models
+        horizons: Number of days (forecasts days 1..horizons), a 1-D array
+            of days ahead shared by all blocks, or a (blocks, k) matrix
+        
+    Returns:
+        numpy.ndarray: Days ahead, broadcastable against the blocks
+    """
+    if np.ndim(horizons) == 0:
+        horizons = np.arange(1, int(horizons) + 1)
+    horizons = np.asarray(horizons, dtype=float)
+    if horizons.ndim == 1:
+        return horizons[None, :]
+    if horizons.shape[0] != len(models):
+        raise ValueError(f"Expected one row of horizons per block ({len(models)}), "
+                         f"got {horizons.shape[0]}")
+    return horizons
+
+
+def forecast_batched(models, horizons=FORECAST_DAYS):
+    """
+    Forecast the days after every block's last reading.
+    
+    Args:
+        models (pandas.DataFrame): Result of fit_batched_models
+        horizons: Number of days to predict, a 1-D array of days ahead or a
+            (blocks, k) matrix of days ahead per block
+        
+    Returns:
+        numpy.ndarray: One row of predictions per block
+    """
+    future = models['n_days'].to_numpy()[:, None] + _horizon_matrix(models, horizons)
+    return models['intercept'].to_numpy()[:, None] + models['slope'].to_numpy()[:, None] * future
+
+
+def forecast_intervals(models, horizons=FORECAST_DAYS, confidence=FORECAST_CONFIDENCE):
+    """
+    Forecasts with closed-form prediction intervals for every block.
+    
+    The interval of a new observation at day x0 of an ordinary least
+    squares line is prediction +/- t * s * sqrt(1 + 1/n + (x0 - x_mean)^2 / Sxx),
+    with s the residual standard error of the training fit and t the
+    Student t quantile at n - 2 degrees of freedom. Blocks with fewer than
+    three training days get NaN bounds.
+    
+    Args:
+        models (pandas.DataFrame): Result of fit_batched_models
+        horizons: As in forecast_batched
+        confidence (float): Coverage of the intervals (e.g. 0.95)
+        
+    Returns:
+        dict: forecast, lower and upper arrays of one row per block
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be in (0, 1), got {confidence}")
+    
+    forecast = forecast_batched(models, horizons)
+    future = models['n_days'].to_numpy()[:, None] + _horizon_matrix(models, horizons)
+    
+    n_train = models['n_train'].to_numpy()[:, None]
+    sxx = models['sxx'].to_numpy()[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_quantile = stats.t.ppf((1 + confidence) / 2, n_train - 2)
+        leverage = np.where(sxx > 0, (future - models['x_mean'].to_numpy()[:, None]) ** 2 / sxx, 0.0)
+        half_width = (t_quantile * models['residual_std'].to_numpy()[:, None] *
+                      np.sqrt(1 + 1 / n_train + leverage))
+    
+    return {
+        'forecast': forecast,
+        'lower': forecast - half_width,
+        'upper': forecast + half_width
+    }
+
+
+def get_batched_prediction_summary(df, consumption_col, block_index=None, models=None):
+    """
+    Prediction summaries of all hostel blocks from one batched fit.
+    
+    Args:
+        df (pandas.DataFrame): Input dataframe
+        consumption_col (str): Name of consumption column
+        block_index (dict): Optional partition index of df from build_block_index
+        models (pandas.DataFrame): Optional result of fit_batched_models
+            for df, to reuse an existing fit
+        
+    Returns:
+        dict: Block -> summary in the format of get_prediction_summary
+    """
+    if models is None:
+        models = fit_batched_models(df, consumption_col, block_index)
+    if models is None:
+        return {}
+    
+    forecasts = forecast_batched(models, FORECAST_DAYS)
+    summaries = {}
+    for (block, model), week_predictions in zip(models.iterrows(), forecasts):
+        next_day_pred = week_predictions[0]
+        last_value = model['last_actual_value']
+        summaries[block] = {
+            'model_metrics': {
+                'r2_score': model['r2_score'],
+                'mse': model['mse'],
+                'rmse': model['rmse'],
+                'mae': model['mae']
+            },
+            'last_actual_value': last_value,
+            'next_day_prediction': next_day_pred,
+            'next_week_predictions': week_predictions.tolist(),
+            'trend_direction': 'Increasing' if next_day_pred > last_value else 'Decreasing',
+            'predicted_change': next_day_pred - last_value
+        }
+    
+    return summaries
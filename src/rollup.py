@@ -0,0 +1,321 @@
+"""
+Rollup Module
+This module maintains a materialized rollup cube of meter readings.
+
+Readings are pre-aggregated (sum, count, min, max, mean and sum of
+squared deviations from the mean) by resource, hostel block and period
+at three grains: day, week (starting Monday) and month. Cells merge with
+Chan's parallel formula, like online_stats.RunningStats, so variances
+stay exact for large cumulative meter values. New rows are merged into
+the affected periods only, so the cube is never rebuilt from the raw data. Queries are answered from
+the coarsest grain whose periods exactly cover the requested date range,
+so a five-year monthly view reads a few hundred rows instead of millions.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from online_stats import RunningStats
+
+
+# Rollup grains, finest first
+GRAINS = ('day', 'week', 'month')
+
+_KEYS = ['resource', 'hostel_block', 'period']
+
+# Aggregates kept in every cell of the cube
+_CELL_COLUMNS = ['sum', 'count', 'min', 'max', 'mean', 'm2']
+
+
+def period_start(dates, grain):
+    """
+    Start of the period each date falls in.
+    
+    Args:
+        dates (pandas.Series): Dates
+        grain (str): 'day', 'week' or 'month'
+    
+    Returns:
+        pandas.Series: Period start dates (midnight)
+    """
+    days = dates.dt.normalize()
+    if grain == 'day':
+        return days
+    if grain == 'week':
+        return days - pd.to_timedelta(days.dt.weekday, unit='D')
+    if grain == 'month':
+        return days - pd.to_timedelta(days.dt.day - 1, unit='D')
+    raise ValueError(f"Unknown grain {grain!r}, expected one of {GRAINS}")
+
+
+def _covers(grain, start_date, end_date):
+    """Check that [start_date, end_date] is a union of whole periods."""
+    if grain == 'day':
+        return True
+    if grain == 'week':
+        return ((start_date is None or start_date.weekday() == 0) and
+                (end_date is None or end_date.weekday() == 6))
+    return ((start_date is None or start_date.day == 1) and
+            (end_date is None or end_date.is_month_end))
+
+
+class RollupCube:
+    """
+    Pre-aggregated readings by (resource, hostel block, period) at the
+    day, week and month grains. Safe to share between threads.
+    """
+    
+    def __init__(self):
+        self._tables = {grain: None for grain in GRAINS}
+        self._lock = threading.Lock()
+    
+    def update(self, resource, rows, consumption_col, reset=False):
+        """
+        Merge new rows into every grain.
+        
+        Args:
+            resource (str): Resource name (e.g. 'Electricity')
+            rows (pandas.DataFrame): New rows (preprocess_data output)
+            consumption_col (str): Name of consumption column
+            reset (bool): Drop the resource's rollups first (used when the
+                source was reloaded from scratch)
+        """
+        partials = {}
+        if rows is not None and len(rows):
+            values = rows[consumption_col].astype(float)
+            frame = pd.DataFrame({
+                'hostel_block': rows['hostel_block'].astype(str).to_numpy(),
+                'value': values.to_numpy()
+            })
+            for grain in GRAINS:
+                frame['period'] = period_start(rows['date'], grain).to_numpy()
+                grouped = frame.groupby(['hostel_block', 'period'], sort=True)['value']
+                partial = grouped.agg(['sum', 'count', 'min', 'max', 'mean'])
+                deviation = frame['value'] - grouped.transform('mean')
+                partial['m2'] = (deviation ** 2).groupby(
+                    [frame['hostel_block'], frame['period']], sort=True
+                ).sum()
+                partials[grain] = pd.concat({resource: partial}, names=['resource'])
+        
+        with self._lock:
+            for grain in GRAINS:
+                table = self._tables[grain]
+                if reset and table is not None:
+                    table = table.drop(resource, level='resource', errors='ignore')
+                if grain in partials:
+                    table = self._merge(table, partials[grain])
+                self._tables[grain] = table
+    
+    @staticmethod
+    def _merge(table, partial):
+        """Merge partial aggregates into a table, touching only their keys."""
+        if table is None or len(table) == 0:
+            return partial
+        touched = table.index.isin(partial.index)
+        if touched.any():
+            partial = _merge_cells(pd.concat([table[touched], partial]), _KEYS)
+        return pd.concat([table[~touched], partial]).sort_index()
+    
+    def choose_grain(self, start_date=None, end_date=None):
+        """
+        Coarsest grain whose periods exactly cover a date range.
+        
+        Args:
+            start_date (str): Optional first date (inclusive)
+            end_date (str): Optional last date (inclusive)
+        
+        Returns:
+            str: 'month', 'week' or 'day'
+        """
+        start_date = pd.Timestamp(start_date) if start_date is not None else None
+        end_date = pd.Timestamp(end_date) if end_date is not None else None
+        for grain in reversed(GRAINS):
+            if _covers(grain, start_date, end_date):
+                return grain
+        return 'day'
+    
+    def aggregates(self, resource, hostel_block=None, start_date=None, end_date=None,
+                   grain=None):
+        """
+        Rollup rows of a resource within a date range.
+        
+        Args:
+            resource (str): Resource name
+            hostel_block (str): Optional block filter
+            start_date (str): Optional first date (inclusive)
+            end_date (str): Optional last date (inclusive)
+            grain (str): Grain to read; by default the coarsest one that
+                exactly covers the date range
+        
+        Returns:
+            pandas.DataFrame: sum, count, min, max, mean and m2 (sum of
+                squared deviations) indexed by hostel_block and period
+                (empty if nothing matches)
+        """
+        if grain is None:
+            grain = self.choose_grain(start_date, end_date)
+        elif grain not in GRAINS:
+            raise ValueError(f"Unknown grain {grain!r}, expected one of {GRAINS}")
+        
+        with self._lock:
+            table = self._tables[grain]
+        
+        empty = pd.DataFrame(
+            columns=_CELL_COLUMNS,
+            index=pd.MultiIndex.from_arrays([[], []], names=_KEYS[1:])
+        )
+        if table is None or resource not in table.index.get_level_values('resource'):
+            return empty
+        
+        rows = table.xs(resource, level='resource')
+        if hostel_block is not None:
+            rows = rows[rows.index.get_level_values('hostel_block') == str(hostel_block)]
+        
+        periods = rows.index.get_level_values('period')
+        mask = np.ones(len(rows), dtype=bool)
+        if start_date is not None:
+            mask &= periods >= period_start(pd.Series([pd.Timestamp(start_date)]), grain)[0]
+        if end_date is not None:
+            mask &= periods <= pd.Timestamp(end_date)
+        return rows[mask]
+    
+    def running_stats(self, resource, hostel_block=None, start_date=None, end_date=None):
+        """
+        Statistics of a range as an accumulator, e.g. for
+        analysis.calculate_statistics(accumulator=...).
+        
+        Returns:
+            RunningStats: Merged statistics of the matching periods
+        """
+        rows = self.aggregates(resource, hostel_block, start_date, end_date)
+        if len(rows) == 0:
+            return RunningStats()
+        (mean,), (m2,) = _merge_moments(
+            np.zeros(len(rows), dtype=np.intp), rows['count'], rows['mean'], rows['m2']
+        )
+        return _to_running_stats({
+            'sum': rows['sum'].sum(), 'count': rows['count'].sum(), 'min': rows['min'].min(),
+            'max': rows['max'].max(), 'mean': mean, 'm2': m2
+        })
+    
+    def block_table(self, resource, start_date=None, end_date=None):
+        """
+        Per-block statistics of a range, usable as block_stats in
+        analysis.compare_blocks.
+        
+        Returns:
+            pandas.DataFrame: Indexed by hostel_block with average, maximum,
+                minimum, std_dev, total and count columns
+        """
+        rows = self.aggregates(resource, None, start_date, end_date)
+        blocks = _merge_cells(rows, 'hostel_block').sort_index() if len(rows) else rows
+        stats = {block: _to_running_stats(row).to_dict() for block, row in blocks.iterrows()}
+        table = pd.DataFrame.from_dict(stats, orient='index')
+        table = table.drop(columns='median', errors='ignore')
+        table.index.name = 'hostel_block'
+        return table
+    
+    def frame(self, resource, grain='month', hostel_block=None, start_date=None,
+              end_date=None, consumption_col='total'):
+        """
+        Per-period totals shaped like preprocessed data (one row per block
+        and period, sorted by block and date), e.g. for charts or
+        analysis.analyze_block_trends at the period's grain.
+        
+        Returns:
+            pandas.DataFrame: date, hostel_block and consumption_col columns
+        """
+        rows = self.aggregates(resource, hostel_block, start_date, end_date, grain=grain)
+        return pd.DataFrame({
+            'date': rows.index.get_level_values('period'),
+            'hostel_block': rows.index.get_level_values('hostel_block'),
+            consumption_col: rows['sum'].to_numpy()
+        })
+    
+    def save(self, path):
+        """
+        Store the cube in one Parquet file (requires pyarrow).
+        
+        Args:
+            path (str): Output file path
+        """
+        with self._lock:
+            tables = {grain: table for grain, table in self._tables.items() if table is not None}
+        if not tables:
+            return
+        pd.concat(tables, names=['grain']).reset_index().to_parquet(path, index=False)
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Restore a cube written by save.
+        
+        Args:
+            path (str): Parquet file path
+        
+        Returns:
+            RollupCube: Cube with the saved rollups
+        """
+        cube = cls()
+        stored = pd.read_parquet(path)
+        for grain, table in stored.groupby('grain', sort=False):
+            cube._tables[grain] = table.drop(columns='grain').set_index(_KEYS).sort_index()
+        return cube
+
+
+def _merge_moments(groups, count, mean, m2):
+    """
+    Merge the means and sums of squared deviations of parts of groups
+    with Chan's formula for any number of parts:
+    M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2), which never subtracts
+    two large sums of squares.
+    
+    Args:
+        groups (numpy.ndarray): Group number (0..k-1) of every part
+        count, mean, m2 (array-like): Readings, mean and sum of squared
+            deviations of every part
+    
+    Returns:
+        tuple: (mean, m2) arrays, one entry per group
+    """
+    count = np.asarray(count, dtype=float)
+    # Empty parts (no readings) have no mean and add nothing
+    mean = np.where(count > 0, np.asarray(mean, dtype=float), 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        merged_mean = np.bincount(groups, count * mean) / np.bincount(groups, count)
+        spread = count * (mean - merged_mean[groups]) ** 2
+    merged_m2 = np.bincount(groups, np.nan_to_num(np.asarray(m2, dtype=float)) + spread)
+    return merged_mean, merged_m2
+
+
+def _merge_cells(cells, level):
+    """
+    Merge rollup cells that share the given index level(s): sums and
+    counts add up, min/max combine and means and M2 merge exactly.
+    
+    Returns:
+        pandas.DataFrame: One merged cell per key
+    """
+    grouped = cells.groupby(level=level, sort=False)
+    merged = grouped.agg({'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'})
+    merged['mean'], merged['m2'] = _merge_moments(
+        grouped.ngroup().to_numpy(), cells['count'], cells['mean'], cells['m2']
+    )
+    return merged[_CELL_COLUMNS]
+
+
+def _to_running_stats(cell):
+    """Build an accumulator from one merged cell (Series or dict)."""
+    stats = RunningStats()
+    count = int(cell['count'])
+    if count == 0:
+        return stats
+    stats.count = count
+    stats.total = cell['sum']
+    stats.mean = cell['mean']
+    stats.m2 = cell['m2']
+    stats.minimum = cell['min']
+    stats.maximum = cell['max']
+    return stats
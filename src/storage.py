@@ -0,0 +1,219 @@
+"""
+Storage Module
+This module provides an optional SQLite storage backend for meter data.
+
+All readings live in one ``readings`` table with a composite index on
+(resource, hostel_block, date), so resource, block and date-range filters
+are answered by the index inside the query instead of loading every row
+and filtering in pandas.
+
+Import CSV files into the database with:
+    python src/storage.py data/electricity_data.csv data/water_data.csv
+"""
+
+import argparse
+import os
+import sqlite3
+
+import pandas as pd
+
+
+DEFAULT_DB_PATH = 'data/hostel_data.db'
+
+# Consumption column used by each resource's CSV file
+RESOURCE_COLUMNS = {
+    'electricity': 'units_consumed',
+    'water': 'liters_used'
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    resource TEXT NOT NULL,
+    hostel_block TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL NOT NULL
+);
+"""
+
+_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_readings_resource_block_date
+    ON readings (resource, hostel_block, date)
+"""
+
+
+def connect(db_path=DEFAULT_DB_PATH):
+    """
+    Open the database and make sure the schema exists.
+    
+    Args:
+        db_path (str): Path to the SQLite database file
+    
+    Returns:
+        sqlite3.Connection: Open connection
+    """
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    conn.execute(_INDEX)
+    return conn
+
+
+def _to_iso_date(value):
+    """Normalize a date-like value to the 'YYYY-MM-DD' text stored in the table."""
+    return pd.to_datetime(value).strftime('%Y-%m-%d')
+
+
+def import_csv_to_db(csv_path, resource=None, db_path=DEFAULT_DB_PATH,
+                     chunksize=200_000, replace=True):
+    """
+    Import a meter CSV file into the database.
+    
+    Args:
+        csv_path (str): Path to the CSV file
+        resource (str): 'electricity' or 'water'; inferred from the
+            consumption column when omitted
+        db_path (str): Path to the SQLite database file
+        chunksize (int): Number of rows inserted per batch
+        replace (bool): Delete existing rows of the resource first
+    
+    Returns:
+        int: Number of imported rows
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if resource is None:
+        matches = [r for r, col in RESOURCE_COLUMNS.items() if col in header]
+        if len(matches) != 1:
+            raise ValueError(f"Cannot infer resource type from columns {list(header)}")
+        resource = matches[0]
+    consumption_col = RESOURCE_COLUMNS[resource]
+    
+    conn = connect(db_path)
+    imported = 0
+    try:
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM readings WHERE resource = ?", (resource,))
+            
+            # Bulk loading is much faster without maintaining the index
+            # row by row; it is rebuilt in one sorted pass afterwards
+            conn.execute("DROP INDEX IF EXISTS idx_readings_resource_block_date")
+            
+            reader = pd.read_csv(
+                csv_path,
+                usecols=['date', 'hostel_block', consumption_col],
+                dtype={'hostel_block': str},
+                chunksize=chunksize
+            )
+            with reader:
+                for chunk in reader:
+                    chunk = chunk.dropna()
+                    dates = pd.to_datetime(chunk['date']).dt.strftime('%Y-%m-%d')
+                    conn.executemany(
+                        "INSERT INTO readings (resource, hostel_block, date, value) "
+                        "VALUES (?, ?, ?, ?)",
+                        zip(
+                            [resource] * len(chunk),
+                            chunk['hostel_block'].tolist(),
+                            dates.tolist(),
+                            chunk[consumption_col].astype(float).tolist()
+                        )
+                    )
+                    imported += len(chunk)
+            
+            conn.execute(_INDEX)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    
+    return imported
+
+
+def load_from_db(resource, db_path=DEFAULT_DB_PATH, hostel_block=None,
+                 start_date=None, end_date=None):
+    """
+    Load readings of one resource, pushing the filters down into SQL.
+    
+    Args:
+        resource (str): 'electricity' or 'water'
+        db_path (str): Path to the SQLite database file
+        hostel_block (str): Optional hostel block filter
+        start_date (str): Optional start date in 'YYYY-MM-DD' format
+        end_date (str): Optional end date in 'YYYY-MM-DD' format
+    
+    Returns:
+        pandas.DataFrame: Readings sorted by hostel_block and date, with the
+            same columns as the resource's CSV file
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(db_path)
+    
+    consumption_col = RESOURCE_COLUMNS[resource]
+    
+    clauses = ["resource = ?"]
+    params = [resource]
+    if hostel_block is not None:
+        clauses.append("hostel_block = ?")
+        params.append(str(hostel_block))
+    if start_date:
+        clauses.append("date >= ?")
+        params.append(_to_iso_date(start_date))
+    if end_date:
+        clauses.append("date <= ?")
+        params.append(_to_iso_date(end_date))
+    
+    query = (
+        f"SELECT date, hostel_block, value AS {consumption_col} FROM readings "
+        f"WHERE {' AND '.join(clauses)} ORDER BY hostel_block, date"
+    )
+    
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+    
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+    return df
+
+
+def get_blocks(resource, db_path=DEFAULT_DB_PATH):
+    """
+    List the hostel blocks stored for a resource.
+    
+    Args:
+        resource (str): 'electricity' or 'water'
+        db_path (str): Path to the SQLite database file
+    
+    Returns:
+        list: Sorted block identifiers
+    """
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT DISTINCT hostel_block FROM readings WHERE resource = ? "
+            "ORDER BY hostel_block",
+            (resource,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import meter CSV files into SQLite")
+    parser.add_argument('csv_files', nargs='+', help="CSV files to import")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database path")
+    parser.add_argument('--resource', choices=sorted(RESOURCE_COLUMNS),
+                        help="Resource type (inferred from the CSV header if omitted)")
+    parser.add_argument('--append', action='store_true',
+                        help="Keep existing rows instead of replacing them")
+    args = parser.parse_args()
+    
+    for csv_path in args.csv_files:
+        count = import_csv_to_db(
+            csv_path, args.resource, args.db, replace=not args.append
+        )
+        print(f"✅ Imported {count} records from {csv_path} into {args.db}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Tests for the robust (median/MAD) anomaly baseline and block comparison.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis import (
+    MAD_SCALE,
+    _robust_baseline,
+    _rolling_median_mad,
+    calculate_grouped_statistics,
+    compare_blocks,
+    detect_anomalies
+)
+
+
+def _frame(values, blocks):
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=len(values)),
+        'hostel_block': blocks,
+        'units_consumed': values
+    })
+
+
+def _brute_force_rolling_mad(values, blocks, window):
+    """Median and scaled MAD of every trailing window, one window at a time."""
+    median = np.full(len(values), np.nan)
+    mad = np.full(len(values), np.nan)
+    for i in range(len(values)):
+        start = max(i - window + 1, 0)
+        while blocks[start] != blocks[i]:
+            start += 1
+        current = values[start:i + 1]
+        current = current[~np.isnan(current)]
+        if len(current) >= 2:
+            median[i] = np.median(current)
+            mad[i] = np.median(np.abs(current - median[i])) * MAD_SCALE
+    return median, mad
+
+
+def test_rolling_mad_matches_brute_force():
+    rng = np.random.default_rng(7)
+    values = rng.normal(100, 10, 600)
+    values[300:] += 80  # level shift
+    values[[50, 150, 420]] = np.nan
+    blocks = np.repeat(['A', 'B', 'C'], 200)
+    df = _frame(values, blocks)
+    
+    for by_block in (False, True):
+        median, mad = _robust_baseline(df, 'units_consumed', by_block=by_block, window=30)
+        expected_median, expected_mad = _brute_force_rolling_mad(
+            values, blocks if by_block else np.zeros(len(values)), 30
+        )
+        np.testing.assert_allclose(median, expected_median, equal_nan=True)
+        np.testing.assert_allclose(mad, expected_mad, equal_nan=True)
+
+
+def test_rolling_mad_with_ties_matches_brute_force():
+    rng = np.random.default_rng(5)
+    values = rng.integers(0, 6, 900).astype(float)
+    values[rng.random(900) < 0.05] = np.nan
+    blocks = np.repeat(['A', 'B', 'C', 'D'], [5, 300, 95, 500])
+    df = _frame(values, blocks)
+    
+    for window in (2, 7, 64, 250):
+        median, mad = _robust_baseline(df, 'units_consumed', by_block=True, window=window)
+        expected_median, expected_mad = _brute_force_rolling_mad(values, blocks, window)
+        np.testing.assert_allclose(median, expected_median, equal_nan=True)
+        np.testing.assert_allclose(mad, expected_mad, equal_nan=True)
+
+
+def test_rolling_mad_cost_does_not_grow_with_window():
+    values = np.random.default_rng(9).normal(100, 10, 20000)
+    segment_starts = np.zeros(len(values), dtype=np.int64)
+    
+    def best_time(window):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            _rolling_median_mad(values, window, segment_starts)
+            times.append(time.perf_counter() - start)
+        return min(times)
+    
+    # Sorting every window would make the wide window hundreds of times slower
+    assert best_time(5000) < 4 * best_time(10)
+
+
+def test_rolling_mad_flags_match_brute_force():
+    rng = np.random.default_rng(3)
+    values = rng.normal(50, 5, 400)
+    values[200:] += 40
+    df = _frame(values, 'A')
+    
+    result = detect_anomalies(df, 'units_consumed', threshold=2.0, window=20, method='mad')
+    median, mad = _brute_force_rolling_mad(values, np.zeros(len(values)), 20)
+    expected = (values > median + 2.0 * mad) | (values < median - 2.0 * mad)
+    np.testing.assert_array_equal(result['is_anomaly'].to_numpy(), expected)
+
+
+def test_compare_blocks_from_grouped_statistics_matches_scan():
+    rng = np.random.default_rng(5)
+    values = np.round(rng.normal(100, 30, 20000), 3)
+    values[rng.random(len(values)) < 0.05] = np.nan
+    df = pd.DataFrame({
+        'date': np.tile(pd.date_range('2024-01-01', periods=50), 400),
+        'hostel_block': np.repeat([f'B{i:03d}' for i in range(400)], 50),
+        'units_consumed': values
+    })
+    
+    block_stats, _ = calculate_grouped_statistics(df, 'units_consumed')
+    expected = compare_blocks(df, 'units_consumed')
+    result = compare_blocks(df, 'units_consumed', block_stats)
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
@@ -0,0 +1,24 @@
+"""
+Tests for the streaming anomaly detector checkpoints.
+"""
+
+import numpy as np
+import pandas as pd
+
+from anomaly_stream import StreamingAnomalyDetector
+
+
+def test_checkpoint_restores_block_id_types(tmp_path):
+    detector = StreamingAnomalyDetector(warmup=2)
+    dates = pd.date_range('2024-01-01', periods=5)
+    for block in ['A', 7, np.int64(8)]:
+        list(detector.process((date, block, 100.0 + i) for i, date in enumerate(dates)))
+    
+    path = tmp_path / 'detector.json'
+    detector.save(str(path))
+    restored = StreamingAnomalyDetector.load(str(path))
+    
+    for block in ['A', 7, 8]:
+        assert restored.block_state(block) == detector.block_state(block)
+    assert set(map(type, restored._state)) == {str, int}
+    assert [name.name for name in tmp_path.iterdir()] == ['detector.json']
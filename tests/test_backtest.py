@@ -0,0 +1,45 @@
+"""
+Tests for the rolling-origin backtest.
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest import backtest
+
+
+def _direct_block_mae(y, horizons, min_train, window):
+    """Mean absolute error per horizon, refitting every fold directly."""
+    errors = {h: [] for h in horizons}
+    for t in range(min_train, len(y)):
+        a = 0 if window is None else max(t - window, 0)
+        x = np.arange(a + 1, t + 1, dtype=float)
+        x_mean, y_mean = x.mean(), y[a:t].mean()
+        slope = np.dot(x - x_mean, y[a:t] - y_mean) / np.dot(x - x_mean, x - x_mean)
+        for h in horizons:
+            if t + h <= len(y):
+                prediction = y_mean + slope * (t + h - x_mean)
+                errors[h].append(abs(prediction - y[t + h - 1]))
+    return [np.mean(errors[h]) for h in horizons]
+
+
+def test_many_large_blocks_match_direct_refit():
+    rng = np.random.default_rng(11)
+    n_blocks, n_days = 3000, 120
+    values = 5e7 + rng.normal(0, 50, (n_blocks, n_days)) + np.arange(n_days) * 3.0
+    df = pd.DataFrame({
+        'date': np.tile(pd.date_range('2024-01-01', periods=n_days), n_blocks),
+        'hostel_block': np.repeat([f'B{i:04d}' for i in range(n_blocks)], n_days),
+        'units_consumed': values.reshape(-1)
+    })
+    horizons = (1, 7)
+    
+    for window in (None, 30):
+        result = backtest(df, 'units_consumed', horizons=horizons, min_train=14,
+                          window=window, by_block=True)
+        # The last blocks sit at the end of the frame, where sums over the
+        # whole frame would be largest
+        for i in (0, n_blocks - 2, n_blocks - 1):
+            expected = _direct_block_mae(values[i], horizons, 14, window)
+            actual = result.xs(f'B{i:04d}', level='hostel_block')['mae'].to_numpy()
+            np.testing.assert_allclose(actual, expected, rtol=1e-9)
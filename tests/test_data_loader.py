@@ -0,0 +1,99 @@
+"""
+Tests for the CSV loaders.
+"""
+
+import os
+import stat
+
+import pandas as pd
+
+from data_loader import (
+    IncrementalCSVReader, _cache_path, _source_fingerprint, _write_cache, load_electricity_data
+)
+
+
+def test_csv_filters_match_the_database_backend(tmp_path):
+    path = tmp_path / 'electricity.csv'
+    pd.DataFrame({
+        'date': list(pd.date_range('2024-01-01', periods=10)) * 2,
+        'hostel_block': ['A'] * 10 + ['B'] * 10,
+        'units_consumed': range(20)
+    }).to_csv(path, index=False)
+    
+    df = load_electricity_data(str(path), use_cache=False, hostel_block='B',
+                               start_date='2024-01-03', end_date='2024-01-05')
+    
+    assert df['hostel_block'].tolist() == ['B', 'B', 'B']
+    assert df['date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-01-03', '2024-01-04', '2024-01-05']
+    assert df['units_consumed'].tolist() == [12, 13, 14]
+    
+    assert len(load_electricity_data(str(path), use_cache=False)) == 20
+
+
+def test_cache_file_permissions_follow_the_umask(tmp_path):
+    path = tmp_path / 'electricity.csv'
+    pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=3),
+        'hostel_block': 'A',
+        'units_consumed': [1, 2, 3]
+    }).to_csv(path, index=False)
+    os.chmod(path, 0o600)
+    
+    umask = os.umask(0o027)
+    try:
+        load_electricity_data(str(path))
+    finally:
+        os.umask(umask)
+    
+    assert stat.S_IMODE(os.stat(_cache_path(str(path))).st_mode) == 0o640
+    assert sorted(os.listdir(tmp_path)) == ['electricity.csv', 'electricity.csv.cache.parquet']
+
+
+def test_cache_write_failure_does_not_fail_the_load(tmp_path):
+    path = tmp_path / 'electricity.csv'
+    path.write_text('date,hostel_block,units_consumed\n2024-01-01,A,1\n')
+    # Mixed int/str object columns, as low_memory parsing can produce,
+    # cannot be converted to Arrow
+    mixed = pd.DataFrame({'hostel_block': pd.Series([1, 'A'], dtype=object)})
+    
+    _write_cache(str(path), mixed, _source_fingerprint(str(path)))
+    
+    assert os.listdir(tmp_path) == ['electricity.csv']
+
+
+def test_chunked_read_keeps_every_column(tmp_path):
+    path = tmp_path / 'electricity.csv'
+    pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=7),
+        'hostel_block': ['A', 'B', 'A', 'B', 'A', 'B', 'A'],
+        'units_consumed': [1, 2, 3, 4, 5, 6, 7],
+        'meter_id': ['m1', 'm2', 'm1', 'm2', 'm1', 'm2', 'm1']
+    }).to_csv(path, index=False)
+    
+    full = load_electricity_data(str(path), use_cache=False)
+    chunked = load_electricity_data(str(path), use_cache=False, chunksize=3)
+    
+    assert list(chunked.columns) == list(full.columns)
+    assert chunked['meter_id'].tolist() == full['meter_id'].tolist()
+    assert chunked['units_consumed'].tolist() == full['units_consumed'].tolist()
+
+
+def test_appended_rows_merge_like_a_full_reload(tmp_path):
+    path = tmp_path / 'electricity.csv'
+    pd.DataFrame({
+        'date': list(pd.date_range('2024-01-01', periods=5)) * 2,
+        'hostel_block': ['B'] * 5 + ['D'] * 5,
+        'units_consumed': range(10)
+    }).to_csv(path, index=False)
+    reader = IncrementalCSVReader(str(path), 'units_consumed', use_cache=False)
+    reader.refresh()
+    
+    # Rows for existing blocks, in between existing dates, and new blocks
+    with open(path, 'a') as f:
+        f.write("2024-01-06,B,10\n2024-01-02,D,11\n2024-01-01,A,12\n2024-01-03,C,13\n2024-01-09,E,14\n")
+    df, data_version, snapshot = reader.refresh()
+    
+    expected = IncrementalCSVReader(str(path), 'units_consumed', use_cache=False).refresh()[0]
+    pd.testing.assert_frame_equal(df, expected)
+    assert snapshot is None
+    assert reader.refresh(snapshot=lambda: 'stats')[2] == 'stats'
@@ -0,0 +1,33 @@
+"""
+Tests for the model registry.
+"""
+
+import os
+import stat
+
+import numpy as np
+
+from model_registry import ModelRegistry
+
+
+def test_disk_tier_survives_restart_with_umask_permissions(tmp_path):
+    # A shared sticky directory must not make the pickles world-writable
+    os.chmod(tmp_path, 0o1777)
+    X = np.arange(1, 11).reshape(-1, 1)
+    y = np.arange(10, dtype=float) * 2
+    
+    umask = os.umask(0o022)
+    try:
+        registry = ModelRegistry(cache_dir=str(tmp_path))
+        registry.train('Electricity', 'A', X, y)
+    finally:
+        os.umask(umask)
+    assert registry.stats()['misses'] == 1
+    
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].endswith('.pkl')
+    assert stat.S_IMODE(os.stat(tmp_path / files[0]).st_mode) == 0o644
+    
+    restarted = ModelRegistry(cache_dir=str(tmp_path))
+    restarted.train('Electricity', 'A', X, y)
+    assert restarted.stats()['disk_hits'] == 1
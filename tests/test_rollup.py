@@ -0,0 +1,36 @@
+"""
+Tests for the rollup cube.
+"""
+
+import numpy as np
+import pandas as pd
+
+from rollup import RollupCube
+
+
+def test_large_cumulative_readings_keep_their_variance():
+    rng = np.random.default_rng(4)
+    dates = pd.date_range('2024-01-01', periods=120)
+    df = pd.DataFrame({
+        'date': np.tile(dates, 2),
+        'hostel_block': np.repeat(['A', 'B'], len(dates)),
+        # Cumulative meter readings: huge offset, small spread
+        'units_consumed': 3e9 + rng.normal(0, 0.5, 2 * len(dates))
+    })
+    
+    cube = RollupCube()
+    # Several incremental updates, so cells are merged repeatedly
+    for part in np.array_split(np.arange(len(dates)), 7):
+        cube.update('Electricity', df[df['date'].isin(dates[part])], 'units_consumed')
+    
+    values = df['units_consumed']
+    stats = cube.running_stats('Electricity')
+    assert stats.count == len(df)
+    np.testing.assert_allclose(stats.mean, values.mean(), rtol=1e-15)
+    np.testing.assert_allclose(stats.std_dev, values.std(), rtol=1e-6)
+    
+    table = cube.block_table('Electricity', start_date='2024-02-01', end_date='2024-03-31')
+    in_range = df[(df['date'] >= '2024-02-01') & (df['date'] <= '2024-03-31')]
+    expected = in_range.groupby('hostel_block')['units_consumed'].std()
+    assert list(table.index) == ['A', 'B']
+    np.testing.assert_allclose(table['std_dev'].to_numpy(dtype=float), expected.to_numpy(), rtol=1e-6)